@@ -0,0 +1,235 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from time import perf_counter
+from typing import List, Tuple
+
+from config.settings import get_settings
+from project.protocol import (
+    QUERY_TERMINATOR,
+    ProtocolSession,
+    RequestBuffer,
+    decode_query,
+)
+from project.search_scripts.engine import SearchEngine
+from project.search_scripts.registry import create_engine
+from server import create_ssl_context, install_reload_signal
+from utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+async def answer_requests(
+    writer: asyncio.StreamWriter,
+    session: ProtocolSession,
+    executor: Executor,
+    requests: List[str],
+) -> None:
+    """
+    Run pipelined requests on the executor and queue their responses on the connection.
+
+    :param writer: The stream the responses are written to.
+    :param session: The protocol state of the connection.
+    :param executor: The executor the searches run on, keeping the event loop responsive.
+    :param requests: The decoded request lines.
+    :return: None
+    """
+    if not requests:
+        return
+    search_start_time = perf_counter()
+    response = await asyncio.get_running_loop().run_in_executor(
+        executor, session.handle_lines, requests
+    )
+    logger.debug(
+        f"Answered {len(requests)} request(s) in "
+        f"{(perf_counter() - search_start_time) * 1e3:.3f} milliseconds"
+    )
+    writer.write(response)
+
+
+async def read_first_request(
+    reader: asyncio.StreamReader, max_payload_size: int, first_line_timeout: float
+) -> Tuple[bytes, bool]:
+    """
+    Read the start of a connection until it shows which protocol the client speaks, like
+    ``server.read_first_request``.
+
+    :param reader: The stream queries are read from.
+    :param max_payload_size: Maximum number of bytes allowed in a single query.
+    :param first_line_timeout: Seconds to wait for each further packet of the first line.
+    :return: The bytes read, and whether the client sends newline-terminated queries.
+    """
+    data = await reader.read(max_payload_size)
+    if not data or QUERY_TERMINATOR in data:
+        return data, True
+    try:
+        while QUERY_TERMINATOR not in data and len(data) < max_payload_size:
+            chunk = await asyncio.wait_for(
+                reader.read(max_payload_size - len(data)), first_line_timeout
+            )
+            if not chunk:
+                return data, False
+            data += chunk
+    except asyncio.TimeoutError:
+        return data, False
+    return data, QUERY_TERMINATOR in data
+
+
+async def handle_client(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    engine: SearchEngine,
+    executor: Executor,
+) -> None:
+    """
+    Serve newline-terminated queries from one client until it closes the connection or sends
+    nothing for ``connection_idle_timeout`` seconds. A first request that ends without a
+    terminator (see ``read_first_request``) is treated as a single legacy query and the connection
+    is closed once it is answered.
+
+    :param reader: The stream queries are read from.
+    :param writer: The stream responses are written to.
+    :param engine: The search engine used to answer the queries.
+    :param executor: The executor searches run on.
+    :return: None
+    """
+    client_address = writer.get_extra_info("peername")
+    buffer = RequestBuffer(settings.max_payload_size)
+    session = ProtocolSession(
+        engine, settings.max_batch_size, settings.allow_admin_commands
+    )
+
+    try:
+        data, keep_alive = await asyncio.wait_for(
+            read_first_request(
+                reader, settings.max_payload_size, settings.first_line_timeout
+            ),
+            settings.connection_idle_timeout,
+        )
+        if data and not keep_alive:
+            await answer_requests(writer, session, executor, [decode_query(data)])
+            await writer.drain()
+            return
+
+        while data:
+            await answer_requests(writer, session, executor, buffer.feed(data))
+            await writer.drain()
+            data = await asyncio.wait_for(
+                reader.read(settings.max_payload_size), settings.connection_idle_timeout
+            )
+
+        await answer_requests(writer, session, executor, buffer.flush())
+        await writer.drain()
+    except asyncio.TimeoutError:
+        logger.info(
+            f"Connection from {client_address} idle for {settings.connection_idle_timeout}s"
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid request from {client_address}: {e}")
+    except (ConnectionError, OSError) as e:
+        logger.error(f"OS error handling client connection: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error during client connection handling: {e}")
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+        logger.info(f"Closed client connection from {client_address}")
+
+
+async def serve(
+    bind_address: str,
+    port: int,
+    server_backlog: int,
+    engine: SearchEngine,
+    executor: Executor,
+    reuse_port: bool = False,
+) -> None:
+    """
+    Listen for clients on the running event loop until cancelled.
+
+    :param bind_address: The address to bind the server to.
+    :param port: The port to listen on.
+    :param server_backlog: The maximum backlog of connections.
+    :param engine: The search engine used to answer queries.
+    :param executor: The executor searches run on.
+    :param reuse_port: Whether to bind with SO_REUSEPORT so several processes share the port.
+    :return: None
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_client(reader, writer, engine, executor),
+        host=bind_address,
+        port=port,
+        backlog=server_backlog,
+        reuse_port=reuse_port or None,
+        ssl=create_ssl_context() if settings.ssl_enabled else None,
+    )
+    logger.info(
+        f"Async server listening on {bind_address}:{port} with backlog {server_backlog}"
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def start_async_server(
+    bind_address: str,
+    port: int,
+    file_path: str,
+    server_backlog: int,
+    reread_on_query: bool,
+    search_algorithm: str = settings.search_algorithm,
+    match_mode: str = settings.match_mode,
+    watch_file: bool = settings.watch_file,
+    bloom_filter: bool = settings.bloom_filter,
+    worker_pool_size: int = settings.worker_pool_size,
+    reuse_port: bool = False,
+) -> None:
+    """
+    Start an asyncio server. Connections are multiplexed on one event loop and only the searches
+    themselves run on worker threads, so idle or slow clients do not each hold a thread.
+
+    :param bind_address: The address to bind the server to.
+    :param port: The port to listen on.
+    :param file_path: The path to the data file.
+    :param server_backlog: The maximum backlog of connections.
+    :param reread_on_query: Boolean indicating whether to re-read the file on each query.
+    :param search_algorithm: Name of the registered search engine to use, or ``auto``.
+    :param match_mode: Whether a line must equal, start with or contain the query.
+    :param watch_file: Boolean indicating whether to keep a cached index refreshed on file changes.
+    :param bloom_filter: Boolean indicating whether to answer definite misses from a Bloom filter.
+    :param worker_pool_size: Number of threads running searches.
+    :param reuse_port: Whether to bind with SO_REUSEPORT so several processes share the port.
+    :return: None
+    """
+    try:
+        engine = create_engine(
+            search_algorithm,
+            file_path,
+            reread_on_query,
+            watch_file,
+            settings.bloom_false_positive_rate if bloom_filter else None,
+            match_mode,
+            settings.result_cache_size,
+            settings.result_cache_ttl,
+        )
+    except ValueError as e:
+        logger.error(f"Invalid search engine configuration: {e}")
+        return
+
+    install_reload_signal(engine)
+    executor = ThreadPoolExecutor(
+        max_workers=worker_pool_size, thread_name_prefix="search-worker"
+    )
+    try:
+        asyncio.run(
+            serve(bind_address, port, server_backlog, engine, executor, reuse_port)
+        )
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        logger.error(f"Socket error during server setup: {e}")
+    finally:
+        executor.shutdown(wait=False)
+        logger.info("Server closed")
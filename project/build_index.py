@@ -0,0 +1,89 @@
+import argparse
+import sys
+
+from config.settings import get_settings
+from project.search_scripts.index_file import (
+    hash_index_path_for,
+    index_path_for,
+    suffix_array_path_for,
+    verify_index,
+    write_hash_index,
+    write_index,
+    write_suffix_array,
+)
+from utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compile a data file into a prebuilt index that the sorted_array engine "
+        "memory-maps at startup instead of reading and sorting the file."
+    )
+    parser.add_argument(
+        "file_path",
+        nargs="?",
+        default=settings.linuxpath,
+        help="Data file to index (defaults to linuxpath from the settings).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Where to write the index (defaults to the data file path with an .idx suffix).",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Check an existing index against the data file's checksum instead of building one.",
+    )
+    parser.add_argument(
+        "--suffix-array",
+        action="store_true",
+        help="Save the suffix array used by the suffix_array engine instead of the sorted index "
+        "(defaults to the data file path with an .sa suffix).",
+    )
+    parser.add_argument(
+        "--lcp",
+        action="store_true",
+        help="Save the LCP array along with the suffix array.",
+    )
+    parser.add_argument(
+        "--hash",
+        action="store_true",
+        help="Write the flat hash index the hash_set engine maps instead of the sorted index "
+        "(defaults to the data file path with an .hidx suffix).",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    """
+    Build or verify the prebuilt index for a data file.
+    """
+
+    args = parse_args()
+    index_path = args.output or index_path_for(args.file_path)
+
+    try:
+        if args.suffix_array:
+            write_suffix_array(
+                args.file_path,
+                args.output or suffix_array_path_for(args.file_path),
+                args.lcp,
+            )
+        elif args.hash:
+            write_hash_index(
+                args.file_path, args.output or hash_index_path_for(args.file_path)
+            )
+        elif args.verify:
+            if not verify_index(index_path, args.file_path):
+                logger.error(f"Index {index_path} does not match {args.file_path}")
+                sys.exit(1)
+            logger.info(f"Index {index_path} matches {args.file_path}")
+        else:
+            write_index(args.file_path, index_path)
+    except (OSError, ValueError) as e:
+        logger.error(f"An error occurred while processing the index: {e}")
+        sys.exit(1)
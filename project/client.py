@@ -1,5 +1,6 @@
 import socket
 import ssl
+from typing import Iterable, List, Optional, Tuple
 
 from config.settings import get_settings
 from project.search_scripts.linear_search import get_logger
@@ -12,12 +13,11 @@ port = settings.port
 use_ssl = settings.ssl_enabled
 
 
-def query_server(query):
+def create_client_socket() -> socket.socket:
     """
-    Connect to the server, send a query, and return the response.
+    Create a client socket, wrapped with SSL when it is enabled.
 
-    :param query: The query string to send to the server.
-    :return: The response from the server.
+    :return: The (unconnected) client socket.
     """
 
     # Create a plain (non-SSL) socket object
@@ -29,20 +29,31 @@ def query_server(query):
         context.load_verify_locations(
             settings.certfile_path
         )  # Ensure the client trusts the server certificate
-        client_socket = context.wrap_socket(sock, server_hostname=ip_address)
-    else:
-        client_socket = sock
+        return context.wrap_socket(sock, server_hostname=ip_address)
+    return sock
+
+
+def query_server(query):
+    """
+    Connect to the server, send a query, and return the response.
+
+    :param query: The query string to send to the server.
+    :return: The response from the server.
+    """
+
+    client_socket = create_client_socket()
 
     try:
         # Connect to the server
         client_socket.connect((ip_address, port))
         logger.debug(f"Successfully connected to {ip_address} on port {port}")
 
-        # Send the query string
-        client_socket.sendall(query.encode("utf-8"))
+        # Send the query string, terminated so the server answers it as soon as it arrives
+        client_socket.sendall(f"{query}\n".encode("utf-8"))
 
-        # Receive the response from the server
-        response = client_socket.recv(1024).decode("utf-8")
+        # Receive the response line from the server
+        with client_socket.makefile("rb") as reader:
+            response = reader.readline().decode("utf-8")
         logger.debug(f"Received from server: {response}")
 
         return response
@@ -57,6 +68,147 @@ def query_server(query):
         logger.info("Connection closed...")
 
 
-# Example usage
-example_query = settings.query_string
-server_response = query_server(example_query)
+class SearchClient:
+    """
+    Keeps one connection open to the server and sends newline-terminated queries over it, so
+    the TCP connect and TLS handshake are paid once rather than per query.
+
+    :param host: The server address.
+    :param server_port: The server port.
+    """
+
+    def __init__(self, host: str = ip_address, server_port: int = port):
+        self.host = host
+        self.server_port = server_port
+        self.sock: Optional[socket.socket] = None
+        self.reader = None
+
+    def connect(self) -> None:
+        """
+        Open the connection to the server.
+        """
+        self.sock = create_client_socket()
+        self.sock.connect((self.host, self.server_port))
+        self.reader = self.sock.makefile("rb")
+        logger.debug(
+            f"Successfully connected to {self.host} on port {self.server_port}"
+        )
+
+    def query(self, query: str) -> str:
+        """
+        Send one query and wait for its response.
+
+        :param query: The query string to send to the server.
+        :return: The response line from the server, without its terminator.
+        """
+        return self.query_many([query])[0]
+
+    def query_many(self, queries: Iterable[str]) -> List[str]:
+        """
+        Pipeline several queries: send them all, then read one response line per query.
+
+        :param queries: The query strings to send to the server.
+        :return: The response lines from the server, in query order.
+        """
+        if self.sock is None:
+            self.connect()
+        queries = list(queries)
+        payload = "".join(f"{query}\n" for query in queries)
+        self.sock.sendall(payload.encode("utf-8"))
+        responses = []
+        for _ in queries:
+            line = self.reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+            responses.append(line.decode("utf-8").rstrip("\n"))
+        return responses
+
+    def query_batch(self, queries: Iterable[str]) -> List[bool]:
+        """
+        Check many strings in one round trip with the ``BATCH`` command.
+
+        :param queries: The query strings to send to the server.
+        :return: One boolean per query, True if the string exists in the file.
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        if self.sock is None:
+            self.connect()
+        payload = f"BATCH {len(queries)}\n" + "".join(f"{query}\n" for query in queries)
+        self.sock.sendall(payload.encode("utf-8"))
+        line = self.reader.readline().decode("utf-8").rstrip("\n")
+        status, _, bits = line.partition(" ")
+        if status != "RESULTS":
+            raise ValueError(f"Unexpected batch response: {line}")
+        return [bit == "1" for bit in bits]
+
+    def query_prefix(self, prefix: str, limit: int = 0) -> Tuple[int, List[str]]:
+        """
+        Count the lines starting with a prefix with the ``PREFIX`` command.
+
+        :param prefix: The prefix to look for.
+        :param limit: The maximum number of matching lines to return.
+        :return: The number of matching lines and up to ``limit`` of them in sorted order.
+        """
+        return self.query_count(f"PREFIX {prefix} {limit}", limit)
+
+    def query_fields(self, pattern: str, limit: int = 0) -> Tuple[int, List[str]]:
+        """
+        Count the lines matching a field pattern such as ``13;*;23;*;0;*;*;0;`` with the
+        ``FIELDS`` command.
+
+        :param pattern: The field pattern, ``*`` matching any single field.
+        :param limit: The maximum number of matching lines to return.
+        :return: The number of matching lines and up to ``limit`` of them.
+        """
+        return self.query_count(f"FIELDS {pattern} {limit}", limit)
+
+    def query_count(self, request: str, limit: int) -> Tuple[int, List[str]]:
+        """
+        Send a counting command and read its ``COUNT`` answer and matching lines.
+
+        :param request: The command line, without its terminator.
+        :param limit: The maximum number of matching lines the command returns.
+        :return: The number of matching lines and the lines returned.
+        """
+        if self.sock is None:
+            self.connect()
+        self.sock.sendall(f"{request}\n".encode("utf-8"))
+        line = self.reader.readline().decode("utf-8").rstrip("\n")
+        status, _, count = line.partition(" ")
+        if status != "COUNT":
+            raise ValueError(f"Unexpected count response: {line}")
+        count = int(count)
+        lines = [
+            self.reader.readline().decode("utf-8").rstrip("\n")
+            for _ in range(min(count, limit))
+        ]
+        return count, lines
+
+    def close(self) -> None:
+        """
+        Close the connection to the server.
+        """
+        if self.sock is not None:
+            self.reader.close()
+            self.sock.close()
+            self.sock = None
+            self.reader = None
+            logger.info("Connection closed...")
+
+    def __enter__(self) -> "SearchClient":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    # Example usage
+    example_query = settings.query_string
+    server_response = query_server(example_query)
+
+    with SearchClient() as client:
+        logger.info(f"Pipelined responses: {client.query_many([example_query] * 3)}")
@@ -16,8 +16,32 @@ class Settings(BaseSettings):
     :param server_backlog: Maximum backlog of connections.
     :param max_payload_size: Maximum payload size for incoming requests.
     :param reread_on_query: Whether to re-read the file on each query.
+    :param max_batch_size: Maximum number of queries accepted in one BATCH request.
+    :param allow_admin_commands: Whether clients may send admin commands such as RELOAD.
+    :param connection_idle_timeout: Seconds a persistent connection may stay idle before it is closed.
+    :param first_line_timeout: Seconds to wait for the rest of a first request that arrives without
+        a newline before answering it as a single legacy query.
+    :param watch_file: Whether to keep a cached index that is refreshed only when the file's inode,
+        size or modification time change, instead of re-reading it on each query.
+    :param bloom_filter: Whether to put a Bloom filter in front of the engines where it pays off.
+    :param bloom_false_positive_rate: Target false-positive rate of the Bloom filter.
+    :param worker_processes: Number of server processes sharing the port with SO_REUSEPORT.
+    :param scan_processes: Worker processes used by the parallel_scan engine (0 for one per core,
+        divided between the ``worker_processes``).
+    :param suffix_array_lcp: Whether the suffix_array engine also builds the LCP array.
+    :param result_cache_size: Number of query results kept in the LRU result cache (0 disables it).
+    :param result_cache_ttl: Seconds a cached result stays valid (0 for no expiry).
+    :param server_mode: Server implementation to run (threaded or asyncio).
+    :param search_algorithm: Search engine to run (auto, linear, mmap, numpy_scan,
+        parallel_scan, aho_corasick, hash_set, sorted_array, packed_records, suffix_array, trie, kmp,
+        boyer_moore, horspool).
+    :param match_mode: Whether a line must equal (exact), start with (prefix) or contain
+        (substring) a query; engines that cannot answer the mode are rejected at startup.
+    :param worker_pool_size: Number of worker threads answering client requests; idle connections hold none.
+    :param worker_queue_size: Connections allowed to wait for a worker before answering SERVER BUSY.
     :param ssl_enabled: Whether SSL/TLS is enabled.
     :param ssl_key: Password for the SSL private key.
+    :param ssl_handshake_timeout: Seconds a client may take to complete its TLS handshake.
     :param ip_address: IP address for the server.
     :param certfile_path: Path to the SSL certificate file.
     :param keyfile_path: Path to the SSL key file.
@@ -36,11 +60,29 @@ class Settings(BaseSettings):
     server_backlog: int = 5
     max_payload_size: int = 1024
     reread_on_query: bool = True
+    max_batch_size: int = 100000
+    allow_admin_commands: bool = False
+    connection_idle_timeout: float = 30.0
+    first_line_timeout: float = 0.005
+    watch_file: bool = False
+    bloom_filter: bool = False
+    bloom_false_positive_rate: float = 0.01
+    worker_processes: int = 1
+    scan_processes: int = 0
+    suffix_array_lcp: bool = False
+    result_cache_size: int = 0
+    result_cache_ttl: float = 0.0
+    server_mode: str = "threaded"
+    search_algorithm: str = "auto"
+    match_mode: str = "exact"
+    worker_pool_size: int = 32
+    worker_queue_size: int = 128
     query_string: str = "13;0;23;11;0;16;5;0;"
 
     # SSL config
     ssl_enabled: bool = True
     ssl_key: str = "pass"
+    ssl_handshake_timeout: float = 5.0
     certfile_path: str = os.path.join(base_dir, "project/certificates/server.crt")
     keyfile_path: str = os.path.join(base_dir, "project/certificates/private.key")
 
@@ -1,4 +1,6 @@
+from async_server import start_async_server
 from config.settings import get_settings
+from prefork import start_prefork_server
 from project.search_scripts.linear_search import get_logger
 from server import start_server
 
@@ -6,20 +8,66 @@ settings = get_settings()
 logger = get_logger(__name__)
 
 
-if __name__ == "__main__":
-    """
-    Main entry point for starting the server. Reads the necessary configuration from config
-    and starts the server with the specified parameters.
+def run_server(reuse_port: bool = False) -> None:
     """
+    Start the server selected by ``server_mode`` with the configured parameters.
 
-    try:
-        path = settings.linuxpath
+    :param reuse_port: Whether to bind with SO_REUSEPORT so several processes share the port.
+    :return: None
+    """
+    path = settings.linuxpath
+    if settings.server_mode == "asyncio":
+        start_async_server(
+            bind_address=settings.bind_address,
+            port=settings.port,
+            file_path=path,
+            server_backlog=settings.server_backlog,
+            reread_on_query=settings.reread_on_query,
+            search_algorithm=settings.search_algorithm,
+            match_mode=settings.match_mode,
+            watch_file=settings.watch_file,
+            bloom_filter=settings.bloom_filter,
+            worker_pool_size=settings.worker_pool_size,
+            reuse_port=reuse_port,
+        )
+    elif settings.server_mode == "threaded":
         start_server(
             bind_address=settings.bind_address,
             port=settings.port,
             file_path=path,
             server_backlog=settings.server_backlog,
             reread_on_query=settings.reread_on_query,
+            search_algorithm=settings.search_algorithm,
+            match_mode=settings.match_mode,
+            watch_file=settings.watch_file,
+            bloom_filter=settings.bloom_filter,
+            worker_pool_size=settings.worker_pool_size,
+            worker_queue_size=settings.worker_queue_size,
+            reuse_port=reuse_port,
+        )
+    else:
+        logger.error(
+            f"Unknown server_mode '{settings.server_mode}', expected 'threaded' or 'asyncio'"
         )
+
+
+if __name__ == "__main__":
+    """
+    Main entry point for starting the server. Reads the necessary configuration from config
+    and starts the server with the specified parameters.
+    """
+
+    try:
+        if settings.worker_processes > 1:
+            start_prefork_server(
+                run_server,
+                worker_processes=settings.worker_processes,
+                file_path=settings.linuxpath,
+                search_algorithm=settings.search_algorithm,
+                reread_on_query=settings.reread_on_query and not settings.watch_file,
+                match_mode=settings.match_mode,
+            )
+        else:
+            run_server()
     except Exception as e:
         logger.error(f"An error occurred while starting the server: {e}")
@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+from project.search_scripts.hash_set_search import share_hash_index
+from project.search_scripts.index_file import (
+    hash_index_path_for,
+    index_path_for,
+    load_hash_index,
+    load_index,
+    write_hash_index,
+    write_index,
+)
+from project.search_scripts.registry import resolve_engine_name
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Workers that exit sooner than this after starting are restarted with an increasing delay
+MIN_WORKER_UPTIME = 5.0
+MAX_RESTART_DELAY = 30.0
+
+# Engine name -> default path, loader and writer of the prebuilt index its workers map, and how
+# the workers are told to map it, or None if the engine maps any matching index at the default
+# path on its own. An index that must be shared explicitly is only written to a directory the
+# supervisor owns, so it never changes how later single-process servers answer.
+SHARED_INDEXES = {
+    "sorted_array": (index_path_for, load_index, write_index, None),
+    "hash_set": (
+        hash_index_path_for,
+        load_hash_index,
+        write_hash_index,
+        share_hash_index,
+    ),
+}
+
+
+def prepare_shared_index(
+    file_path: str, engine_name: str = "sorted_array", directory: Optional[str] = None
+) -> None:
+    """
+    Make sure a prebuilt index matching the data file exists before the workers start, so each of
+    them memory-maps the same file and they share one copy of the index in the page cache.
+
+    :param file_path: The path to the data file.
+    :param engine_name: The engine the workers run, one of ``SHARED_INDEXES``.
+    :param directory: Where to write an index the workers are told to map instead of its default
+        path, when none matching the data file exists there.
+    :return: None
+    """
+    path_for, load, write, share = SHARED_INDEXES[engine_name]
+    index_path = path_for(file_path)
+    if load(index_path, file_path) is None:
+        if share is not None and directory is not None:
+            index_path = os.path.join(directory, os.path.basename(index_path))
+        try:
+            write(file_path, index_path)
+        except OSError as e:
+            logger.warning(
+                f"Could not write shared index, workers will build their own: {e}"
+            )
+            return
+    if share is not None:
+        share(file_path, index_path)
+
+
+def run_worker(worker_target: Callable[..., None]) -> None:
+    """
+    Entry point of a worker process.
+
+    :param worker_target: Starts a server bound with SO_REUSEPORT; called with ``reuse_port=True``.
+    :return: None
+    """
+    # Undo the supervisor's handlers inherited across fork; SIGHUP is ignored until the worker's
+    # server installs its own reload handler
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    worker_target(reuse_port=True)
+
+
+class Supervisor:
+    """
+    Runs ``worker_processes`` copies of the server, each binding the same port with SO_REUSEPORT
+    so the kernel balances connections across them and every core can search, and restarts any
+    worker that exits.
+
+    :param worker_target: Starts a server; called in each worker with ``reuse_port=True``.
+    :param worker_processes: Number of worker processes.
+    """
+
+    def __init__(self, worker_target: Callable[..., None], worker_processes: int):
+        self.worker_target = worker_target
+        self.context = multiprocessing.get_context("fork")
+        self.workers: List[Optional[multiprocessing.Process]] = [
+            None
+        ] * worker_processes
+        self.started_at = [0.0] * worker_processes
+        self.restart_delay = [0.0] * worker_processes
+        self.running = True
+
+    def start_worker(self, slot: int) -> None:
+        process = self.context.Process(
+            target=run_worker, args=(self.worker_target,), name=f"search-server-{slot}"
+        )
+        process.start()
+        self.workers[slot] = process
+        self.started_at[slot] = time.monotonic()
+        logger.info(f"Started worker {slot} with pid {process.pid}")
+
+    def check_workers(self) -> None:
+        now = time.monotonic()
+        for slot, process in enumerate(self.workers):
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                logger.error(
+                    f"Worker {slot} (pid {process.pid}) exited with code {process.exitcode}"
+                )
+                uptime = now - self.started_at[slot]
+                if uptime < MIN_WORKER_UPTIME:
+                    self.restart_delay[slot] = min(
+                        max(1.0, self.restart_delay[slot] * 2), MAX_RESTART_DELAY
+                    )
+                else:
+                    self.restart_delay[slot] = 0.0
+                self.workers[slot] = None
+                self.started_at[slot] = now
+            if now - self.started_at[slot] >= self.restart_delay[slot]:
+                self.start_worker(slot)
+
+    def signal_workers(self, signum: int) -> None:
+        for process in self.workers:
+            if process is not None and process.is_alive():
+                os.kill(process.pid, signum)
+
+    def stop(self, signum: int, frame) -> None:
+        self.running = False
+
+    def reload(self, signum: int, frame) -> None:
+        logger.info("Forwarding SIGHUP to the workers")
+        self.signal_workers(signal.SIGHUP)
+
+    def run(self) -> None:
+        """
+        Start the workers and keep them running until SIGTERM or SIGINT.
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGHUP, self.reload)
+
+        try:
+            while self.running:
+                self.check_workers()
+                time.sleep(0.5)
+        finally:
+            logger.info("Stopping workers")
+            self.signal_workers(signal.SIGTERM)
+            for process in self.workers:
+                if process is not None:
+                    process.join(timeout=10)
+            logger.info("Server closed")
+
+
+def start_prefork_server(
+    worker_target: Callable[..., None],
+    worker_processes: int,
+    file_path: str,
+    search_algorithm: str,
+    reread_on_query: bool,
+    match_mode: Optional[str] = None,
+) -> None:
+    """
+    Start a pre-forked multi-process server.
+
+    :param worker_target: Starts a server; called in each worker with ``reuse_port=True``.
+    :param worker_processes: Number of worker processes.
+    :param file_path: The path to the data file.
+    :param search_algorithm: Name of the search engine the workers run.
+    :param reread_on_query: Whether the workers re-read the file on each query instead of
+        keeping an index.
+    :param match_mode: The match mode the workers answer, which ``auto`` picks the engine by.
+    :return: None
+    """
+    engine_name = resolve_engine_name(search_algorithm, reread_on_query, match_mode)
+    with tempfile.TemporaryDirectory(prefix="search-index-") as directory:
+        if engine_name in SHARED_INDEXES and not reread_on_query:
+            prepare_shared_index(file_path, engine_name, directory)
+        Supervisor(worker_target, worker_processes).run()
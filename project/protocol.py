@@ -0,0 +1,234 @@
+from typing import Callable, Dict, Iterable, List
+
+from project.search_scripts.engine import SearchEngine
+
+QUERY_TERMINATOR = b"\n"
+RESPONSE_EXISTS = b"STRING EXISTS\n"
+RESPONSE_NOT_FOUND = b"STRING NOT FOUND\n"
+
+
+def decode_query(raw: bytes) -> str:
+    """
+    Decode a raw query received from a client.
+
+    :param raw: The bytes of a single query, with or without its terminator.
+    :return: The query string stripped of padding and surrounding whitespace.
+    """
+    return raw.decode("utf-8", errors="ignore").rstrip("\x00").strip()
+
+
+def format_search_response(exists: bool) -> bytes:
+    """
+    Encode the answer to a search query.
+
+    :param exists: Whether the query string was found.
+    :return: The response line to send to the client.
+    """
+    return RESPONSE_EXISTS if exists else RESPONSE_NOT_FOUND
+
+
+def format_error(message: str) -> bytes:
+    """
+    Encode an error answer to a malformed request.
+
+    :param message: Description of the problem.
+    :return: The response line to send to the client.
+    """
+    return f"ERROR {message}\n".encode("utf-8")
+
+
+def format_count(count: int, lines: List[str]) -> bytes:
+    """
+    Encode the answer to a counting query.
+
+    :param count: The number of matching lines.
+    :param lines: The matching lines returned.
+    :return: The ``COUNT`` line followed by the lines to send to the client.
+    """
+    return "".join([f"COUNT {count}\n"] + [f"{line}\n" for line in lines]).encode(
+        "utf-8"
+    )
+
+
+def handle_request(engine: SearchEngine, request: str) -> bytes:
+    """
+    Answer a single decoded request with the given engine.
+
+    :param engine: The search engine used to answer the query.
+    :param request: The decoded query string.
+    :return: The response line to send to the client.
+    """
+    return format_search_response(engine.search(request))
+
+
+class ProtocolSession:
+    """
+    Per-connection protocol state. Each request line is either a plain query, answered with
+    ``STRING EXISTS`` or ``STRING NOT FOUND``, or a command:
+
+    ``BATCH <count>`` announces that the next ``count`` lines are queries to be answered together
+    with a single ``RESULTS <bits>`` line, where the i-th character of ``bits`` is ``1`` if the i-th
+    query was found and ``0`` otherwise.
+
+    ``PREFIX <prefix> [limit]`` counts the distinct lines starting with ``prefix``, answering
+    ``COUNT <n>`` followed by the first ``min(n, limit)`` of them in sorted order, one per line.
+    Engines without prefix support answer with an error.
+
+    ``FIELDS <pattern> [limit]`` counts the distinct lines whose semicolon-terminated fields match
+    ``pattern``, where ``*`` matches any single field, answering like ``PREFIX``. Engines without
+    field query support answer with an error.
+
+    Admin commands are only recognised when enabled:
+
+    ``RELOAD`` rebuilds the index in the background and swaps it in once ready, answering
+    ``RELOADING``.
+
+    :param engine: The search engine used to answer the queries.
+    :param max_batch_size: Maximum number of queries allowed in one batch.
+    :param allow_admin_commands: Whether admin commands are accepted on this connection.
+    """
+
+    def __init__(
+        self,
+        engine: SearchEngine,
+        max_batch_size: int,
+        allow_admin_commands: bool = False,
+    ):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.batch_size = 0
+        self.batch: List[str] = []
+        self.commands: Dict[str, Callable[[str], bytes]] = {
+            "BATCH": self.start_batch,
+            "PREFIX": self.prefix,
+            "FIELDS": self.fields,
+        }
+        if allow_admin_commands:
+            self.commands["RELOAD"] = self.reload
+
+    def handle_line(self, line: str) -> bytes:
+        """
+        Process one decoded request line.
+
+        :param line: The decoded request line.
+        :return: The response bytes to send, empty while a batch is still being received.
+        """
+        if self.batch_size:
+            self.batch.append(line)
+            if len(self.batch) < self.batch_size:
+                return b""
+            return self.finish_batch()
+
+        command, _, argument = line.partition(" ")
+        handler = self.commands.get(command)
+        if handler is not None:
+            return handler(argument.strip())
+        return handle_request(self.engine, line)
+
+    def handle_lines(self, lines: Iterable[str]) -> bytes:
+        """
+        Process pipelined request lines in order.
+
+        :param lines: The decoded request lines.
+        :return: The concatenated responses.
+        """
+        return b"".join(self.handle_line(line) for line in lines)
+
+    def start_batch(self, argument: str) -> bytes:
+        try:
+            batch_size = int(argument)
+        except ValueError:
+            return format_error(f"invalid batch size '{argument}'")
+        if not 0 < batch_size <= self.max_batch_size:
+            return format_error(
+                f"batch size must be between 1 and {self.max_batch_size}"
+            )
+        self.batch_size = batch_size
+        return b""
+
+    def parse_limit(self, limit_argument: str) -> int:
+        try:
+            limit = int(limit_argument or 0)
+        except ValueError:
+            raise ValueError(f"invalid limit '{limit_argument}'") from None
+        if not 0 <= limit <= self.max_batch_size:
+            raise ValueError(f"limit must be between 0 and {self.max_batch_size}")
+        return limit
+
+    def prefix(self, argument: str) -> bytes:
+        prefix, _, limit_argument = argument.partition(" ")
+        if not prefix:
+            return format_error("missing prefix")
+        try:
+            limit = self.parse_limit(limit_argument)
+        except ValueError as e:
+            return format_error(str(e))
+        result = self.engine.prefix_search(prefix, limit)
+        if result is None:
+            return format_error(
+                f"prefix queries are not supported by the {self.engine.name} engine"
+            )
+        return format_count(*result)
+
+    def fields(self, argument: str) -> bytes:
+        pattern, _, limit_argument = argument.partition(" ")
+        if not pattern:
+            return format_error("missing pattern")
+        try:
+            limit = self.parse_limit(limit_argument)
+            result = self.engine.field_search(pattern, limit)
+        except ValueError as e:
+            return format_error(str(e))
+        if result is None:
+            return format_error(
+                f"field queries are not supported by the {self.engine.name} engine"
+            )
+        return format_count(*result)
+
+    def reload(self, argument: str) -> bytes:
+        if not self.engine.reload():
+            return format_error("reload already in progress or not supported")
+        return b"RELOADING\n"
+
+    def finish_batch(self) -> bytes:
+        batch, self.batch, self.batch_size = self.batch, [], 0
+        results = self.engine.search_many(batch)
+        bits = "".join("1" if exists else "0" for exists in results)
+        return f"RESULTS {bits}\n".encode("utf-8")
+
+
+class RequestBuffer:
+    """
+    Accumulates bytes received from a client and splits them into newline-terminated queries.
+
+    :param max_query_size: Maximum number of bytes allowed in a single query.
+    """
+
+    def __init__(self, max_query_size: int):
+        self.max_query_size = max_query_size
+        self.pending = b""
+
+    def feed(self, data: bytes) -> List[str]:
+        """
+        Add received bytes to the buffer.
+
+        :param data: The bytes received from the client.
+        :return: The queries completed by this data, in the order they were sent.
+        :raises ValueError: If an unterminated query grows beyond ``max_query_size``.
+        """
+        *lines, self.pending = (self.pending + data).split(QUERY_TERMINATOR)
+        if len(self.pending) > self.max_query_size:
+            raise ValueError(
+                f"Query exceeds the maximum payload size of {self.max_query_size} bytes"
+            )
+        return [decode_query(line) for line in lines]
+
+    def flush(self) -> List[str]:
+        """
+        Return a final unterminated query left in the buffer once the client stops sending.
+
+        :return: The remaining query, if any.
+        """
+        remainder, self.pending = self.pending, b""
+        query = decode_query(remainder)
+        return [query] if query else []
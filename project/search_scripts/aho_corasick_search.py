@@ -0,0 +1,170 @@
+from collections import deque
+from time import perf_counter
+from typing import Dict, Iterable, List
+
+from project.search_scripts.engine import SearchEngine, register_engine
+from project.search_scripts.mmap_search import search_string_in_file
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCAN_CHUNK_SIZE = 1 << 20
+# Smallest batch searched with one automaton. Building it and scanning with it cost about as much
+# as 60 to 100 ``mmap.find`` scans of the same 22MB file (60 when every query misses and each
+# scan reads the whole file), so smaller batches are searched one query at a time
+MIN_AUTOMATON_BATCH = 64
+
+
+class AhoCorasickAutomaton:
+    """
+    Deterministic Aho-Corasick automaton matching many byte patterns in one pass over a text.
+
+    The bytes that occur in no pattern share one input class, so the transition table has one
+    column per distinct pattern byte plus two, rather than 256; ``scan`` maps whole chunks of the
+    text to classes with ``bytes.translate``. A newline always returns to the root, so, like the
+    line-by-line searches, no match spans two lines.
+
+    :param patterns: The non-empty encoded patterns, none containing a newline.
+    """
+
+    def __init__(self, patterns: List[bytes]):
+        self.pattern_count = len(patterns)
+        alphabet = sorted(set(b"".join(patterns)) - {ord("\n")})
+        # Class 0: bytes in no pattern, class 1: newline, then one class per pattern byte
+        classes = bytearray(256)
+        classes[ord("\n")] = 1
+        for cls, byte in enumerate(alphabet, start=2):
+            classes[byte] = cls
+        self.classes = bytes(classes)
+        self.width = width = len(alphabet) + 2
+
+        # Trie of the patterns: sparse goto edges, then filled in breadth first
+        goto: List[Dict[int, int]] = [{}]
+        terminal: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for byte in pattern:
+                cls = classes[byte]
+                next_state = goto[state].get(cls)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][cls] = next_state
+                    goto.append({})
+                    terminal.append([])
+                state = next_state
+            terminal[state].append(pattern_id)
+
+        state_count = len(goto)
+        delta = [0] * (state_count * width)
+        # Nearest state on the failure chain, the state included, that ends a pattern, or -1
+        output_link = [-1] * state_count
+        fail = [0] * state_count
+        queue = deque()
+        for cls, child in goto[0].items():
+            delta[cls] = child
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            base = state * width
+            fail_base = fail[state] * width
+            for cls in range(width):
+                child = goto[state].get(cls)
+                if child is None:
+                    delta[base + cls] = delta[fail_base + cls]
+                else:
+                    delta[base + cls] = child
+                    fail[child] = delta[fail_base + cls]
+                    queue.append(child)
+            output_link[state] = state if terminal[state] else output_link[fail[state]]
+            delta[base + 1] = 0
+
+        self.delta = delta
+        self.fail = fail
+        self.output_link = output_link
+        self.terminal = terminal
+
+    def scan(self, chunks: Iterable[bytes]) -> List[bool]:
+        """
+        Run the automaton over a text, stopping early once every pattern has been seen.
+
+        :param chunks: The text, in consecutive chunks.
+        :return: One boolean per pattern, True if it occurs in the text.
+        """
+        found = [False] * self.pattern_count
+        remaining = self.pattern_count
+        delta, width, output_link = self.delta, self.width, self.output_link
+        fail, terminal, classes = self.fail, self.terminal, self.classes
+        if not remaining:
+            return found
+        state = 0
+        for chunk in chunks:
+            for cls in chunk.translate(classes):
+                state = delta[state * width + cls]
+                match = output_link[state]
+                while match > 0:
+                    for pattern_id in terminal[match]:
+                        if not found[pattern_id]:
+                            found[pattern_id] = True
+                            remaining -= 1
+                    match = output_link[fail[match]]
+                if not remaining:
+                    return found
+        return found
+
+
+def search_strings_in_file(file_path: str, search_strings: List[str]) -> List[bool]:
+    """
+    Search for many strings in a file in a single pass, with an Aho-Corasick automaton built from
+    all of them. Like the linear search, a string is found if it occurs within a line.
+
+    :param file_path: The path to the file to be searched.
+    :param search_strings: The strings to search for within the file.
+    :return: One boolean per search string, True if it is found in the file.
+    """
+    start_time = perf_counter()
+    patterns = [search_string.encode("utf-8") for search_string in search_strings]
+    try:
+        with open(file_path, "rb") as file:
+            # The empty string occurs in any line, so it is found unless the file is empty
+            non_empty = bool(file.read(1))
+            file.seek(0)
+            wanted = sorted(
+                {pattern for pattern in patterns if pattern and b"\n" not in pattern}
+            )
+            automaton = AhoCorasickAutomaton(wanted)
+            found = dict(
+                zip(
+                    wanted,
+                    automaton.scan(iter(lambda: file.read(SCAN_CHUNK_SIZE), b"")),
+                )
+            )
+    except FileNotFoundError:
+        logger.error(f"File not found: {file_path}")
+        return [False] * len(patterns)
+    except OSError as e:
+        logger.error(f"IO error: {e}")
+        return [False] * len(patterns)
+    finally:
+        logger.debug(
+            f"aho-corasick scan for {len(patterns)} strings: "
+            f"{(perf_counter() - start_time) * 1e3:.3f} milliseconds"
+        )
+    return [found.get(pattern, False) if pattern else non_empty for pattern in patterns]
+
+
+@register_engine("aho_corasick")
+class AhoCorasickEngine(SearchEngine):
+    """
+    Substring search that re-reads the file on every query. A single query is a ``mmap.find``
+    scan, while a batch of at least ``MIN_AUTOMATON_BATCH`` queries builds one Aho-Corasick
+    automaton from all of them, so the file is read once per batch rather than once per query.
+    """
+
+    def search(self, query: str) -> bool:
+        return search_string_in_file(self.file_path, query)
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        queries = list(queries)
+        if len(queries) < MIN_AUTOMATON_BATCH:
+            return [self.search(query) for query in queries]
+        return search_strings_in_file(self.file_path, queries)
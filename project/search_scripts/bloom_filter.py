@@ -0,0 +1,156 @@
+import hashlib
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from project.search_scripts.engine import EXACT, SearchEngine
+from project.search_scripts.file_watch import iter_lines_from
+
+# Engines whose lookups cost more than probing the filter; in front of hash_set and trie the
+# filter only adds work, even on misses
+FILTERED_ENGINES = ("sorted_array", "packed_records")
+# Engines whose batches are looked up as one vectorized operation, cheaper than probing the filter
+# once per query, so batches bypass the filter
+BATCH_UNFILTERED_ENGINES = ("packed_records",)
+
+
+def count_lines(file_path: str) -> int:
+    """
+    Count the lines of a file without decoding it.
+
+    :param file_path: The path to the file.
+    :return: The number of lines.
+    """
+    count = 0
+    last_chunk = b""
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            count += chunk.count(b"\n")
+            last_chunk = chunk
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        count += 1
+    return count
+
+
+class BloomFilter:
+    """
+    Probabilistic set membership over a ``bytearray`` of bits. A negative answer is definite,
+    while a positive one is wrong with roughly the configured probability.
+
+    :param capacity: The number of items the filter is sized for.
+    :param false_positive_rate: The target false-positive rate once ``capacity`` items are added.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, item: bytes) -> Iterable[int]:
+        # Double hashing: k bit positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: bytes) -> None:
+        """
+        Add an item to the filter.
+
+        :param item: The encoded item.
+        """
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: bytes) -> bool:
+        bits = self.bits
+        for position in self.positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the bit array.
+        """
+        return len(self.bits)
+
+
+class BloomFilteredEngine(SearchEngine):
+    """
+    Puts a Bloom filter of the file's lines in front of an exact-match engine, so definite misses
+    are answered without touching the engine's index or the disk.
+
+    :param engine: The exact-match engine answering queries the filter lets through.
+    :param false_positive_rate: The target false-positive rate of the filter.
+    """
+
+    match_modes = (EXACT,)
+
+    def __init__(self, engine: SearchEngine, false_positive_rate: float):
+        super().__init__(engine.file_path, engine.reread_on_query, engine.match_mode)
+        self.name = engine.name
+        self.engine = engine
+        self.false_positive_rate = false_positive_rate
+        self.filter = BloomFilter(1, false_positive_rate)
+        self.rejected = 0
+
+    def _build(self) -> None:
+        self.engine.build()
+        bloom_filter = BloomFilter(
+            count_lines(self.file_path), self.false_positive_rate
+        )
+        for line in iter_lines_from(self.file_path, 0):
+            bloom_filter.add(line.encode("utf-8"))
+        self.filter = bloom_filter
+
+    def append_from(self, offset: int) -> bool:
+        # Set the bits first so no appended line is ever rejected by the filter. The filter keeps
+        # its size, so its false-positive rate rises as lines are appended.
+        for line in iter_lines_from(self.file_path, offset):
+            self.filter.add(line.encode("utf-8"))
+        return self.engine.append_from(offset)
+
+    def search(self, query: str) -> bool:
+        if query.encode("utf-8") not in self.filter:
+            self.rejected += 1
+            return False
+        return self.engine.search(query)
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        if self.name in BATCH_UNFILTERED_ENGINES:
+            return self.engine.search_many(queries)
+        queries = list(queries)
+        candidates = [query.encode("utf-8") in self.filter for query in queries]
+        self.rejected += candidates.count(False)
+        found = iter(
+            self.engine.search_many([q for q, c in zip(queries, candidates) if c])
+        )
+        return [next(found) if candidate else False for candidate in candidates]
+
+    def prefix_search(
+        self, prefix: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        # The filter only knows whole lines, so prefix queries go straight to the engine
+        return self.engine.prefix_search(prefix, limit)
+
+    def field_search(
+        self, pattern: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        return self.engine.field_search(pattern, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.engine.stats()
+        stats.update(
+            build_time_ms=round(self.build_time_ms, 3),
+            bloom_filter_bytes=self.filter.nbytes,
+            bloom_hash_count=self.filter.hash_count,
+            bloom_rejected=self.rejected,
+        )
+        return stats
@@ -1,16 +1,37 @@
-# boyer_moore.py
+import mmap
+from functools import lru_cache
+from typing import Iterable, List, Optional, Union
 
+from project.search_scripts.engine import SearchEngine, register_engine
+from project.search_scripts.mmap_search import map_file, read_file
 
-def bad_character_heuristic(pattern):
-    """Generate the bad character heuristic table."""
+# Patterns up to this length are searched with Horspool's simplification, whose single shift
+# table costs less per step than the good suffix rule saves on such short patterns
+HORSPOOL_MAX_LENGTH = 8
+
+Text = Union[bytes, mmap.mmap]
+
+
+def bad_character_heuristic(pattern: bytes) -> List[int]:
+    """
+    Generate the bad character table: the last position of every byte value in the pattern.
+
+    :param pattern: The encoded pattern.
+    :return: 256 positions, -1 for the byte values that do not occur.
+    """
     bad_char = [-1] * 256
-    for i in range(len(pattern)):
-        bad_char[ord(pattern[i])] = i
+    for i, byte in enumerate(pattern):
+        bad_char[byte] = i
     return bad_char
 
 
-def good_suffix_heuristic(pattern):
-    """Generate the good suffix heuristic table."""
+def good_suffix_heuristic(pattern: bytes) -> List[int]:
+    """
+    Generate the good suffix table.
+
+    :param pattern: The encoded pattern.
+    :return: ``good_suffix[j + 1]``, the shift after a mismatch at position ``j``.
+    """
     m = len(pattern)
     good_suffix = [0] * (m + 1)
     border_pos = [0] * (m + 1)
@@ -38,29 +59,180 @@ def good_suffix_heuristic(pattern):
     return good_suffix
 
 
-def boyer_moore_search(text, pattern):
-    """Perform Boyer-Moore search for the pattern in the text."""
-    m = len(pattern)
-    n = len(text)
-
-    if m == 0:  # Edge case: empty pattern
-        return False
-
-    bad_char = bad_character_heuristic(pattern)
-    good_suffix = good_suffix_heuristic(pattern)
-
-    s = 0  # s is the shift of the pattern with respect to text
-    while s <= n - m:
-        j = m - 1
+def horspool_shift_table(pattern: bytes) -> List[int]:
+    """
+    Generate Horspool's shift table: how far the pattern moves when a byte value is under its
+    last position.
 
-        while j >= 0 and pattern[j] == text[s + j]:
-            j -= 1
-
-        if j < 0:
-            return True  # Pattern found at position s
-        else:
-            bad_char_shift = j - bad_char[ord(text[s + j])]
-            good_suffix_shift = good_suffix[j + 1]
-            s += max(bad_char_shift, good_suffix_shift)
-
-    return False  # Pattern not found
+    :param pattern: The non-empty encoded pattern.
+    :return: 256 shifts, the pattern length for the byte values not in the pattern's prefix.
+    """
+    m = len(pattern)
+    shift = [m] * 256
+    for i, byte in enumerate(pattern[:-1]):
+        shift[byte] = m - 1 - i
+    return shift
+
+
+class BoyerMoorePattern:
+    """
+    A query compiled for Boyer-Moore search: the bad character and good suffix tables are built
+    once and reused for every text the query is searched in. As most windows already mismatch on
+    their last byte, the shift for that case is folded into one more table indexed by the byte.
+
+    :param pattern: The non-empty encoded pattern.
+    """
+
+    def __init__(self, pattern: bytes):
+        self.pattern = pattern
+        self.bad_char = bad_character_heuristic(pattern)
+        self.good_suffix = good_suffix_heuristic(pattern)
+        m = len(pattern)
+        self.last_shift = [max(m - 1 - i, self.good_suffix[m]) for i in self.bad_char]
+
+    def find(self, text: Text) -> int:
+        """
+        Find the first occurrence of the pattern in a text.
+
+        :param text: The text, as bytes or a memory mapping.
+        :return: The offset of the occurrence, or -1 if there is none.
+        """
+        pattern, bad_char, good_suffix = self.pattern, self.bad_char, self.good_suffix
+        last_shift = self.last_shift
+        m = len(pattern)
+        last = pattern[-1]
+        s = 0  # s is the shift of the pattern with respect to text
+        end = len(text) - m
+        while s <= end:
+            byte = text[s + m - 1]
+            if byte != last:
+                s += last_shift[byte]
+                continue
+            if text[s : s + m] == pattern:
+                return s
+            # The window differs before its last byte: find the rightmost mismatch
+            j = m - 2
+            while pattern[j] == text[s + j]:
+                j -= 1
+            s += max(j - bad_char[text[s + j]], good_suffix[j + 1])
+        return -1
+
+
+class HorspoolPattern:
+    """
+    A query compiled for Boyer-Moore-Horspool search: every step compares the text byte under the
+    pattern's last position, checks the whole window with one slice comparison on a match, and
+    shifts by that byte's entry in the single precomputed table.
+
+    :param pattern: The non-empty encoded pattern.
+    """
+
+    def __init__(self, pattern: bytes):
+        self.pattern = pattern
+        self.shift = horspool_shift_table(pattern)
+
+    def find(self, text: Text) -> int:
+        """
+        Find the first occurrence of the pattern in a text.
+
+        :param text: The text, as bytes or a memory mapping.
+        :return: The offset of the occurrence, or -1 if there is none.
+        """
+        pattern, shift = self.pattern, self.shift
+        m = len(pattern)
+        last = pattern[-1]
+        s = 0
+        end = len(text) - m
+        while s <= end:
+            byte = text[s + m - 1]
+            if byte == last and text[s : s + m] == pattern:
+                return s
+            s += shift[byte]
+        return -1
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: bytes, horspool: Optional[bool] = None):
+    """
+    Compile a query for searching, once per distinct query.
+
+    :param pattern: The non-empty encoded pattern.
+    :param horspool: Whether to use the Horspool variant; by default only for patterns of at most
+        ``HORSPOOL_MAX_LENGTH`` bytes.
+    :return: The compiled pattern, with a ``find`` method.
+    """
+    if horspool is None:
+        horspool = len(pattern) <= HORSPOOL_MAX_LENGTH
+    return HorspoolPattern(pattern) if horspool else BoyerMoorePattern(pattern)
+
+
+def boyer_moore_search(
+    text: Text, pattern: bytes, horspool: Optional[bool] = None
+) -> bool:
+    """
+    Perform Boyer-Moore search for the pattern in the text.
+
+    :param text: The text, as bytes or a memory mapping.
+    :param pattern: The encoded pattern.
+    :param horspool: Whether to use the Horspool variant, by default chosen by pattern length.
+    :return: True if the pattern is found, False otherwise; the empty pattern occurs in any text.
+    """
+    if not pattern:  # Edge case: empty pattern
+        return True
+    return compile_pattern(pattern, horspool).find(text) != -1
+
+
+@register_engine("boyer_moore")
+class BoyerMooreEngine(SearchEngine):
+    """
+    Substring search over a memory mapping of the file using the Boyer-Moore algorithm, with the
+    Horspool variant for short queries. Queries never contain a newline, so the whole file is
+    searched at once rather than line by line, and each query's tables are built once. When the
+    file is not re-read on each query, a copy of its bytes read at build time is searched instead.
+    """
+
+    # Whether queries use the Horspool variant, by default chosen by query length
+    horspool: Optional[bool] = None
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.contents: Optional[bytes] = None
+
+    def _build(self) -> None:
+        if not self.reread_on_query:
+            self.contents = read_file(self.file_path)
+
+    def search_mapping(self, mapping: Optional[Text], query: str) -> bool:
+        pattern = query.encode("utf-8")
+        if mapping is None or b"\n" in pattern:
+            return False
+        return boyer_moore_search(mapping, pattern, self.horspool)
+
+    def search(self, query: str) -> bool:
+        return self.search_many([query])[0]
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        if not self.reread_on_query:
+            return [self.search_mapping(self.contents, query) for query in queries]
+        # Map the file once for the whole batch
+        mapping = map_file(self.file_path)
+        try:
+            return [self.search_mapping(mapping, query) for query in queries]
+        finally:
+            if mapping is not None:
+                mapping.close()
+
+
+@register_engine("horspool")
+class HorspoolEngine(BoyerMooreEngine):
+    """
+    The Boyer-Moore engine with the Horspool variant for every query, for benchmarking the two
+    against each other.
+    """
+
+    horspool = True
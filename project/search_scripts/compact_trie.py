@@ -0,0 +1,182 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class CompactTrie:
+    """
+    Minimized acyclic word graph (DAWG) of a set of lines, stored in flat arrays instead of a
+    Python object and ``dict`` per character. Identical suffixes, such as the shared ``n;n;`` tails
+    of our records, are stored once.
+
+    Node ``n`` has the outgoing edges ``edge_start[n]`` up to ``edge_start[n + 1]``; edge ``e`` is
+    labelled with the byte ``labels[e]`` and leads to node ``targets[e]``. ``terminal[n]`` is 1
+    when the path to ``n`` spells a whole line, and ``counts[n]`` is the number of lines below
+    ``n``, so prefix counts take one walk down the graph. Nodes are numbered children first, so the
+    root is the last node.
+
+    :param labels: The edge label bytes.
+    :param targets: The edge target nodes.
+    :param edge_start: ``nodes + 1`` offsets of each node's first edge.
+    :param terminal: One byte per node, 1 for nodes ending a line.
+    :param counts: The number of lines below each node, itself included.
+    """
+
+    def __init__(
+        self,
+        labels: bytearray,
+        targets: array,
+        edge_start: array,
+        terminal: bytearray,
+        counts: array,
+    ):
+        self.labels = labels
+        self.targets = targets
+        self.edge_start = edge_start
+        self.terminal = terminal
+        self.counts = counts
+        self.root = len(terminal) - 1
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes]) -> "CompactTrie":
+        """
+        Build the graph from raw lines, merging equivalent nodes as soon as they are complete.
+
+        :param lines: The lines, stripped of surrounding whitespace.
+        :return: The graph.
+        """
+        labels = bytearray()
+        targets = array("I")
+        edge_start = array("I", [0])
+        terminal = bytearray()
+        counts = array("I")
+        # Completed nodes keyed by (terminal, labels, targets); only needed while building
+        register: Dict[Tuple[bool, bytes, Tuple[int, ...]], int] = {}
+
+        def finish(node: list) -> int:
+            key = (node[2], bytes(node[0]), tuple(node[1]))
+            node_id = register.get(key)
+            if node_id is None:
+                node_id = len(terminal)
+                labels.extend(node[0])
+                targets.extend(node[1])
+                edge_start.append(len(labels))
+                terminal.append(node[2])
+                counts.append(node[2] + sum(counts[child] for child in node[1]))
+                register[key] = node_id
+            return node_id
+
+        def close(path: List[list], depth: int) -> None:
+            while len(path) > depth + 1:
+                child = finish(path.pop())
+                path[-1][1].append(child)
+
+        # Nodes along the path of the previous line: [edge labels, child ids, terminal]. The last
+        # label of each node belongs to the child still open below it.
+        path: List[list] = [[bytearray(), [], False]]
+        previous = b""
+        for line in sorted(set(lines)):
+            common = 0
+            for a, b in zip(previous, line):
+                if a != b:
+                    break
+                common += 1
+            close(path, common)
+            for byte in line[common:]:
+                path[-1][0].append(byte)
+                path.append([bytearray(), [], False])
+            path[-1][2] = True
+            previous = line
+        close(path, 0)
+        finish(path.pop())
+        return cls(labels, targets, edge_start, terminal, counts)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "CompactTrie":
+        """
+        Build the graph from the lines of a file.
+
+        :param file_path: The path to the file to be indexed.
+        :return: The graph.
+        """
+        with open(file_path, "rb") as file:
+            return cls.from_lines(line.strip() for line in file)
+
+    def walk(self, key: bytes) -> int:
+        """
+        Follow the edges spelling a key from the root.
+
+        :param key: The encoded key.
+        :return: The node reached, or -1 if the key leaves the graph.
+        """
+        labels, targets, edge_start = self.labels, self.targets, self.edge_start
+        node = self.root
+        for byte in key:
+            edge = labels.find(byte, edge_start[node], edge_start[node + 1])
+            if edge == -1:
+                return -1
+            node = targets[edge]
+        return node
+
+    def __contains__(self, key: bytes) -> bool:
+        node = self.walk(key)
+        return node != -1 and self.terminal[node] == 1
+
+    def has_prefix(self, prefix: bytes) -> bool:
+        """
+        Check whether any line starts with the prefix.
+
+        :param prefix: The encoded prefix.
+        :return: True if some line starts with the prefix.
+        """
+        return self.count_prefix(prefix) > 0
+
+    def count_prefix(self, prefix: bytes) -> int:
+        """
+        Count the lines starting with the prefix.
+
+        :param prefix: The encoded prefix.
+        :return: The number of distinct lines starting with the prefix.
+        """
+        node = self.walk(prefix)
+        return 0 if node == -1 else self.counts[node]
+
+    def iter_prefix(self, prefix: bytes) -> Iterator[bytes]:
+        """
+        Iterate over the lines starting with the prefix.
+
+        :param prefix: The encoded prefix.
+        :return: An iterator of the matching lines in sorted order.
+        """
+        node = self.walk(prefix)
+        if node == -1:
+            return
+        labels, targets, edge_start, terminal = (
+            self.labels,
+            self.targets,
+            self.edge_start,
+            self.terminal,
+        )
+        stack = [(node, prefix)]
+        while stack:
+            node, line = stack.pop()
+            if terminal[node]:
+                yield line
+            # Push the children in reverse so the smallest label is visited first
+            for edge in range(edge_start[node + 1] - 1, edge_start[node] - 1, -1):
+                stack.append((targets[edge], line + bytes((labels[edge],))))
+
+    def __len__(self) -> int:
+        return len(self.terminal)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the arrays.
+        """
+        return (
+            len(self.labels)
+            + len(self.terminal)
+            + len(self.targets) * self.targets.itemsize
+            + len(self.edge_start) * self.edge_start.itemsize
+            + len(self.counts) * self.counts.itemsize
+        )
@@ -0,0 +1,163 @@
+from abc import ABC, abstractmethod
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+# Match modes: a query matches a line, stripped of surrounding whitespace, that equals it, starts
+# with it or contains it
+EXACT = "exact"
+PREFIX = "prefix"
+SUBSTRING = "substring"
+MATCH_MODES = (EXACT, PREFIX, SUBSTRING)
+
+# Match mode -> test of a stripped line against a query
+LINE_MATCHERS: Dict[str, Callable[[str, str], bool]] = {
+    EXACT: str.__eq__,
+    PREFIX: str.startswith,
+    SUBSTRING: str.__contains__,
+}
+
+
+class SearchEngine(ABC):
+    """
+    Common interface implemented by every search algorithm the server can run.
+
+    :param file_path: The path to the file to be searched.
+    :param reread_on_query: Whether the file is to be read again for every query.
+    :param match_mode: How queries match lines, one of ``match_modes``; the first one by default.
+    :raises ValueError: If the engine does not support the match mode.
+    """
+
+    name: str = ""
+    # The match modes the engine can answer, its default first
+    match_modes: Tuple[str, ...] = (SUBSTRING,)
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        match_mode = match_mode or self.match_modes[0]
+        if match_mode not in self.match_modes:
+            raise ValueError(
+                f"The {self.name} engine does not support {match_mode} matching, only: "
+                f"{', '.join(self.match_modes)}"
+            )
+        self.file_path = file_path
+        self.reread_on_query = reread_on_query
+        self.match_mode = match_mode
+        self.built = False
+        self.build_time_ms = 0.0
+
+    def build(self) -> None:
+        """
+        Load or index the file so the engine is ready to answer queries. Engines that scan the
+        file on every query keep the default no-op.
+        """
+        start_time = perf_counter()
+        self._build()
+        self.build_time_ms = (perf_counter() - start_time) * 1e3
+        self.built = True
+
+    def _build(self) -> None:
+        pass
+
+    def append_from(self, offset: int) -> bool:
+        """
+        Index lines appended to the file since it was built.
+
+        :param offset: The byte offset the appended lines start at.
+        :return: False if the engine cannot be updated incrementally and must be rebuilt.
+        """
+        return False
+
+    def reload(self) -> bool:
+        """
+        Rebuild the index from the file without interrupting queries.
+
+        :return: False if the engine does not support reloading or a reload is already running.
+        """
+        return False
+
+    @abstractmethod
+    def search(self, query: str) -> bool:
+        """
+        Check whether the query string exists in the file.
+
+        :param query: The string to search for.
+        :return: True if the string is found, False otherwise.
+        """
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        """
+        Check a sequence of query strings.
+
+        :param queries: The strings to search for.
+        :return: One boolean per query, in order.
+        """
+        return [self.search(query) for query in queries]
+
+    def prefix_search(
+        self, prefix: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        """
+        Count the lines starting with a prefix and list the first of them in sorted order.
+
+        :param prefix: The prefix to look for.
+        :param limit: The maximum number of matching lines to return.
+        :return: The number of distinct matching lines and up to ``limit`` of them, or None if
+            the engine does not support prefix queries.
+        """
+        return None
+
+    def field_search(
+        self, pattern: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        """
+        Count the lines of semicolon-terminated fields matching a pattern such as
+        ``13;*;23;*;0;*;*;0;``, where ``*`` matches any single field, and list the first of them.
+
+        :param pattern: The field pattern.
+        :param limit: The maximum number of matching lines to return.
+        :return: The number of distinct matching lines and up to ``limit`` of them, or None if
+            the engine does not support field queries.
+        :raises ValueError: If the pattern does not end with a semicolon.
+        """
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the engine and its index for logging and benchmarking.
+
+        :return: A dictionary of engine statistics.
+        """
+        return {
+            "engine": self.name,
+            "file_path": self.file_path,
+            "reread_on_query": self.reread_on_query,
+            "match_mode": self.match_mode,
+            "built": self.built,
+            "build_time_ms": round(self.build_time_ms, 3),
+        }
+
+
+# Engine name -> engine class, populated by ``register_engine``
+ENGINES: Dict[str, Type[SearchEngine]] = {}
+
+
+def register_engine(name: str) -> Callable[[Type[SearchEngine]], Type[SearchEngine]]:
+    """
+    Class decorator that makes a search engine selectable through ``Settings.search_algorithm``.
+
+    :param name: The name the engine is registered under.
+    :return: The decorator.
+    """
+
+    def decorator(engine_class: Type[SearchEngine]) -> Type[SearchEngine]:
+        if name in ENGINES:
+            raise ValueError(f"Search engine already registered: {name}")
+        engine_class.name = name
+        ENGINES[name] = engine_class
+        return engine_class
+
+    return decorator
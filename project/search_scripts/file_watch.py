@@ -0,0 +1,108 @@
+import os
+from typing import Iterator, NamedTuple, Tuple
+
+# Number of bytes before the previous end of file compared to tell an append from a rewrite
+TAIL_SIZE = 64
+
+UNCHANGED = "unchanged"
+APPENDED = "appended"
+REPLACED = "replaced"
+
+
+class FileSignature(NamedTuple):
+    """
+    The stat fields used to detect that a file changed.
+    """
+
+    inode: int
+    size: int
+    mtime_ns: int
+
+
+def stat_signature(file_path: str) -> FileSignature:
+    """
+    Stat a file and return its signature.
+
+    :param file_path: The path to the file.
+    :return: The inode, size and modification time of the file.
+    """
+    stat = os.stat(file_path)
+    return FileSignature(stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def read_tail(file_path: str, size: int) -> bytes:
+    """
+    Read the bytes just before the given offset.
+
+    :param file_path: The path to the file.
+    :param size: The offset the tail ends at.
+    :return: Up to ``TAIL_SIZE`` bytes ending at ``size``.
+    """
+    with open(file_path, "rb") as file:
+        file.seek(max(0, size - TAIL_SIZE))
+        return file.read(min(size, TAIL_SIZE))
+
+
+def iter_lines_from(file_path: str, offset: int) -> Iterator[str]:
+    """
+    Iterate over the stripped lines of a file starting at a byte offset.
+
+    :param file_path: The path to the file.
+    :param offset: The byte offset to start reading from; must be at the start of a line.
+    :return: An iterator of stripped lines.
+    """
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        for line in file:
+            yield line.decode("utf-8", errors="ignore").strip()
+
+
+class FileWatcher:
+    """
+    Tracks a file's inode, size and modification time to tell whether it is unchanged, only had
+    lines appended to it, or was rewritten since the last check.
+
+    :param file_path: The path to the watched file.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.signature = stat_signature(file_path)
+        self.tail = read_tail(file_path, self.signature.size)
+
+    def changed(self) -> bool:
+        """
+        Cheap check, a single ``stat`` call, for whether the file differs from the last check.
+
+        :return: True if the signature changed.
+        """
+        try:
+            return stat_signature(self.file_path) != self.signature
+        except OSError:
+            return False
+
+    def check(self) -> Tuple[str, int]:
+        """
+        Classify the change since the last check and remember the new state.
+
+        :return: The kind of change and the file size at the previous check, which is where
+            appended data starts.
+        """
+        previous = self.signature
+        try:
+            current = stat_signature(self.file_path)
+        except OSError:
+            # The file is being replaced; keep serving the current index
+            return UNCHANGED, previous.size
+        if current == previous:
+            return UNCHANGED, previous.size
+
+        appended = (
+            current.inode == previous.inode
+            and current.size > previous.size
+            and (not self.tail or self.tail.endswith(b"\n"))
+            and read_tail(self.file_path, previous.size) == self.tail
+        )
+        self.signature = current
+        self.tail = read_tail(self.file_path, current.size)
+        return (APPENDED if appended else REPLACED), previous.size
@@ -0,0 +1,103 @@
+import zlib
+from array import array
+from typing import Any, Iterable, Sequence
+
+# Slots kept per line at most, so linear probing stays short
+MAX_LOAD_FACTOR = 0.5
+
+
+def line_hash(line: bytes) -> int:
+    """
+    Hash a line the same way in every process; Python's own ``hash`` is seeded per process.
+
+    :param line: The encoded line.
+    :return: The 32-bit hash.
+    """
+    return zlib.crc32(line)
+
+
+def slot_count_for(count: int) -> int:
+    """
+    Size the slot table for a number of lines.
+
+    :param count: The number of distinct lines.
+    :return: The smallest power of two keeping the load factor at most ``MAX_LOAD_FACTOR``.
+    """
+    slots = 1
+    while slots * MAX_LOAD_FACTOR < count + 1:
+        slots *= 2
+    return slots
+
+
+class FlatHashIndex:
+    """
+    Exact-match hash table without a single pointer: the distinct lines are concatenated, each
+    terminated by a newline, and an open-addressing slot table holds, for every line, its offset
+    in the records plus one, with 0 marking an empty slot. Both parts are flat buffers, so the
+    index can live in a memory-mapped file that any number of processes map read-only and share.
+
+    :param records: The concatenated line bytes, each line followed by a newline.
+    :param slots: The slot table, a power of two long.
+    :param count: The number of lines.
+    """
+
+    def __init__(self, records: Any, slots: Sequence[int], count: int):
+        self.records = records
+        self.slots = slots
+        self.count = count
+        self.mask = len(slots) - 1
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes]) -> "FlatHashIndex":
+        """
+        Build the index from raw lines.
+
+        :param lines: The lines, stripped of surrounding whitespace.
+        :return: The index.
+        """
+        distinct = set(lines)
+        slots = array("Q", bytes(8 * slot_count_for(len(distinct))))
+        mask = len(slots) - 1
+        records = bytearray()
+        for line in distinct:
+            slot = line_hash(line) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = len(records) + 1
+            records += line + b"\n"
+        return cls(bytes(records), slots, len(distinct))
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "FlatHashIndex":
+        """
+        Build the index from the lines of a file.
+
+        :param file_path: The path to the file to be indexed.
+        :return: The index.
+        """
+        with open(file_path, "rb") as file:
+            return cls.from_lines(line.strip() for line in file)
+
+    def __contains__(self, key: bytes) -> bool:
+        if b"\n" in key:
+            return False
+        records, slots, mask = self.records, self.slots, self.mask
+        # A record matches only if it ends where the key does
+        record = key + b"\n"
+        slot = line_hash(key) & mask
+        while slots[slot]:
+            start = slots[slot] - 1
+            if records[start : start + len(record)] == record:
+                return True
+            slot = (slot + 1) & mask
+        return False
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the records and the slot table.
+        """
+        return len(self.records) + 8 * len(self.slots)
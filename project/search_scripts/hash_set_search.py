@@ -1,4 +1,29 @@
 # searcher.py
+from typing import Any, Dict, Iterable, List, Optional
+
+from project.search_scripts.engine import EXACT, SearchEngine, register_engine
+from project.search_scripts.file_watch import iter_lines_from
+from project.search_scripts.flat_hash_index import FlatHashIndex
+from project.search_scripts.index_file import load_hash_index
+
+# Data file -> prebuilt hash index that hash_set engines map in place of their set. Probing the
+# mapped index runs in Python and is slower per query than a set lookup, so it is only used where
+# it is asked for: the pre-forked server registers it for its workers, which then share one copy.
+SHARED_HASH_INDEXES: Dict[str, str] = {}
+
+
+def share_hash_index(file_path: str, index_path: str) -> None:
+    """
+    Have the hash_set engines created for a data file from now on, in this process and in the
+    processes it forks, map a prebuilt hash index instead of building their own set.
+
+    :param file_path: The path to the data file.
+    :param index_path: The path to its hash index, see ``index_file.write_hash_index``.
+    :return: None
+    """
+    SHARED_HASH_INDEXES[file_path] = index_path
+
+
 class HashSetSearcher:
     def __init__(self, file_path):
         self.file_path = file_path
@@ -27,6 +52,11 @@ class HashSetSearcher:
 
         return query in lines_set
 
+    def search_many(self, queries, reread=False):
+        # One set lookup per query with no per-query rebuild, logging or encoding
+        lines_set = self.build_hash_set() if reread else self.lines_set
+        return [query in lines_set for query in queries]
+
 
 # Global searcher instance
 searcher = None
@@ -41,3 +71,61 @@ def initialize_searcher(file_path, reread_on_query):
 
 def search_string_in_file_hash_set(query, reread_on_query):
     return searcher.search(query, reread_on_query)
+
+
+@register_engine("hash_set")
+class HashSetEngine(SearchEngine):
+    """
+    Exact line matching against a Python set built from the file. In the worker processes of a
+    pre-forked server, the hash index registered with ``share_hash_index`` is memory-mapped
+    instead when it matches the file, so the workers share one copy of it; lines appended while
+    the file is watched are then kept in the set beside it.
+    """
+
+    match_modes = (EXACT,)
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.searcher = HashSetSearcher(file_path)
+        self.shared_index: Optional[FlatHashIndex] = None
+
+    def _build(self) -> None:
+        if self.reread_on_query:
+            return
+        index_path = SHARED_HASH_INDEXES.get(self.file_path)
+        if index_path is not None:
+            self.shared_index = load_hash_index(index_path, self.file_path)
+        if self.shared_index is None:
+            self.searcher.initialize_cache()
+
+    def search(self, query: str) -> bool:
+        return self.search_many([query])[0]
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        if self.shared_index is None:
+            return self.searcher.search_many(queries, self.reread_on_query)
+        lines_set = self.searcher.lines_set
+        return [
+            query in lines_set or query.encode("utf-8") in self.shared_index
+            for query in queries
+        ]
+
+    def append_from(self, offset: int) -> bool:
+        if self.reread_on_query:
+            return False
+        self.searcher.lines_set.update(iter_lines_from(self.file_path, offset))
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["lines"] = len(self.searcher.lines_set)
+        if self.shared_index is not None:
+            stats["lines"] += len(self.shared_index)
+            stats["index_bytes"] = self.shared_index.nbytes
+        stats["prebuilt"] = self.shared_index is not None
+        return stats
@@ -0,0 +1,436 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Optional
+
+import numpy as np
+
+from project.search_scripts.file_watch import stat_signature
+from project.search_scripts.flat_hash_index import FlatHashIndex
+from project.search_scripts.mmap_search import map_file, read_file
+from project.search_scripts.sorted_index import SortedLineIndex
+from project.search_scripts.suffix_array import SuffixArrayIndex
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_MAGIC = b"FSRCHIDX"
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+# magic, version, reserved, source size, source mtime (ns), source blake2b-128, records, records bytes
+HEADER = struct.Struct("<8sIIQQ16sQQ")
+# The header is padded so the offset table that follows it is 8-byte aligned
+HEADER_SIZE = 64
+
+SUFFIX_ARRAY_MAGIC = b"FSRCHSA\0"
+SUFFIX_ARRAY_VERSION = 1
+SUFFIX_ARRAY_SUFFIX = ".sa"
+# magic, version, flags, source size, source mtime (ns), suffixes, bytes per entry
+SUFFIX_ARRAY_HEADER = struct.Struct("<8sIIQQQQ")
+SUFFIX_ARRAY_HAS_LCP = 1
+
+HASH_INDEX_MAGIC = b"FSRCHHSH"
+HASH_INDEX_VERSION = 1
+HASH_INDEX_SUFFIX = ".hidx"
+# magic, version, reserved, source size, source mtime (ns), lines, slots, records bytes
+HASH_INDEX_HEADER = struct.Struct("<8sIIQQQQQ")
+
+
+def index_path_for(file_path: str) -> str:
+    """
+    Return the default location of the prebuilt index for a data file.
+
+    :param file_path: The path to the data file.
+    :return: The path of its index file.
+    """
+    return file_path + INDEX_SUFFIX
+
+
+def write_index(file_path: str, index_path: Optional[str] = None) -> str:
+    """
+    Compile a data file into a prebuilt index file. The layout is a fixed header, the
+    little-endian ``uint64`` offset table and the sorted records of a ``SortedLineIndex``, so the
+    loader can map it and serve lookups without parsing anything.
+
+    :param file_path: The path to the data file.
+    :param index_path: Where to write the index, by default next to the data file.
+    :return: The path of the written index file.
+    """
+    index_path = index_path or index_path_for(file_path)
+    signature = stat_signature(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(file_path, "rb") as file:
+
+        def lines():
+            for line in file:
+                digest.update(line)
+                yield line.strip()
+
+        index = SortedLineIndex.from_lines(lines())
+
+    offsets = index.offsets
+    if sys.byteorder != "little":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+
+    header = HEADER.pack(
+        INDEX_MAGIC,
+        INDEX_VERSION,
+        0,
+        signature.size,
+        signature.mtime_ns,
+        digest.digest(),
+        len(index),
+        len(index.records),
+    )
+    # Write next to the destination and rename, so readers never map a half-written index
+    temporary_path = f"{index_path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        file.write(offsets.tobytes())
+        file.write(index.records)
+    os.replace(temporary_path, index_path)
+
+    logger.info(f"Wrote index of {len(index)} lines for {file_path} to {index_path}")
+    return index_path
+
+
+def read_header(buffer: bytes) -> tuple:
+    """
+    Unpack and validate the header of an index file.
+
+    :param buffer: The index file contents, or at least its header.
+    :return: The header fields.
+    :raises ValueError: If the file is not an index of a supported version.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("file is too short to be an index")
+    fields = HEADER.unpack_from(buffer)
+    if fields[0] != INDEX_MAGIC:
+        raise ValueError("not an index file")
+    if fields[1] != INDEX_VERSION:
+        raise ValueError(f"unsupported index version {fields[1]}")
+    return fields
+
+
+def matches_source(file_path: str, source_size: int, source_mtime_ns: int) -> bool:
+    """
+    Check that a data file still has the size and modification time recorded in an index built
+    from it.
+
+    :param file_path: The path to the data file.
+    :param source_size: The size recorded in the index.
+    :param source_mtime_ns: The modification time recorded in the index.
+    :return: False if they differ or the data file cannot be stat'ed.
+    """
+    try:
+        signature = stat_signature(file_path)
+    except OSError as e:
+        logger.warning(f"Cannot check data file {file_path}: {e}")
+        return False
+    return (signature.size, signature.mtime_ns) == (source_size, source_mtime_ns)
+
+
+def load_index(
+    index_path: str, file_path: Optional[str] = None
+) -> Optional[SortedLineIndex]:
+    """
+    Memory-map a prebuilt index. Nothing is read up front, so loading takes milliseconds whatever
+    the size of the index, and processes mapping the same file share its pages in the page cache.
+
+    :param index_path: The path to the index file.
+    :param file_path: The data file the index must match; it is rejected as stale if the data
+        file's size or modification time differ from those recorded when it was built.
+    :return: The index, or None if it is missing, invalid or stale.
+    """
+    try:
+        with open(index_path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        _, _, _, source_size, source_mtime_ns, _, count, records_length = read_header(
+            mapping
+        )
+    except ValueError as e:
+        logger.warning(f"Ignoring index {index_path}: {e}")
+        mapping.close()
+        return None
+
+    if file_path is not None and not matches_source(
+        file_path, source_size, source_mtime_ns
+    ):
+        logger.warning(f"Ignoring stale index {index_path} for {file_path}")
+        mapping.close()
+        return None
+
+    records_start = HEADER_SIZE + (count + 1) * 8
+    if len(mapping) != records_start + records_length:
+        logger.warning(f"Ignoring truncated index {index_path}")
+        mapping.close()
+        return None
+
+    view = memoryview(mapping)
+    if sys.byteorder == "little":
+        offsets = view[HEADER_SIZE:records_start].cast("Q")
+    else:
+        offsets = array("Q", view[HEADER_SIZE:records_start])
+        offsets.byteswap()
+    return SortedLineIndex(view[records_start:], offsets)
+
+
+def verify_index(index_path: str, file_path: str) -> bool:
+    """
+    Check that an index was built from the current contents of a data file by comparing checksums.
+
+    :param index_path: The path to the index file.
+    :param file_path: The path to the data file.
+    :return: True if the checksum recorded in the index matches the data file.
+    :raises ValueError: If the index file is not a valid index.
+    """
+    with open(index_path, "rb") as file:
+        header = file.read(HEADER.size)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return read_header(header)[5] == digest.digest()
+
+
+def suffix_array_path_for(file_path: str) -> str:
+    """
+    Return the default location of the saved suffix array for a data file.
+
+    :param file_path: The path to the data file.
+    :return: The path of its suffix array file.
+    """
+    return file_path + SUFFIX_ARRAY_SUFFIX
+
+
+def write_suffix_array(
+    file_path: str, output_path: Optional[str] = None, with_lcp: bool = False
+) -> str:
+    """
+    Build the suffix array of a data file's bytes and save it. The layout is a fixed header
+    followed by the little-endian suffix array and, optionally, the LCP array, both with the
+    entry size the array was built with.
+
+    :param file_path: The path to the data file.
+    :param output_path: Where to write the suffix array, by default next to the data file.
+    :param with_lcp: Whether to compute and save the LCP array as well.
+    :return: The path of the written file.
+    """
+    output_path = output_path or suffix_array_path_for(file_path)
+    signature = stat_signature(file_path)
+    mapping = map_file(file_path)
+    try:
+        index = SuffixArrayIndex.from_text(
+            b"" if mapping is None else mapping, with_lcp
+        )
+        arrays = (
+            [index.suffix_array]
+            if index.lcp is None
+            else [index.suffix_array, index.lcp]
+        )
+        header = SUFFIX_ARRAY_HEADER.pack(
+            SUFFIX_ARRAY_MAGIC,
+            SUFFIX_ARRAY_VERSION,
+            0 if index.lcp is None else SUFFIX_ARRAY_HAS_LCP,
+            signature.size,
+            signature.mtime_ns,
+            len(index),
+            index.suffix_array.itemsize,
+        )
+        temporary_path = f"{output_path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(header.ljust(HEADER_SIZE, b"\0"))
+            for values in arrays:
+                file.write(values.astype(values.dtype.newbyteorder("<")).tobytes())
+        os.replace(temporary_path, output_path)
+    finally:
+        if mapping is not None:
+            mapping.close()
+    logger.info(
+        f"Wrote suffix array of {len(index)} suffixes for {file_path} to {output_path}"
+    )
+    return output_path
+
+
+def load_suffix_array(path: str, file_path: str) -> Optional[SuffixArrayIndex]:
+    """
+    Memory-map a saved suffix array and load the data file it indexes.
+
+    :param path: The path to the suffix array file.
+    :param file_path: The data file the suffix array must match; it is rejected as stale if the
+        data file's size or modification time differ from those recorded when it was built.
+    :return: The index, or None if the file is missing, invalid or stale.
+    """
+    try:
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapping) < SUFFIX_ARRAY_HEADER.size:
+        logger.warning(f"Ignoring suffix array {path}: file is too short")
+        mapping.close()
+        return None
+    magic, version, flags, source_size, source_mtime_ns, count, itemsize = (
+        SUFFIX_ARRAY_HEADER.unpack_from(mapping)
+    )
+    if (
+        magic != SUFFIX_ARRAY_MAGIC
+        or version != SUFFIX_ARRAY_VERSION
+        or itemsize not in (4, 8)
+    ):
+        logger.warning(
+            f"Ignoring suffix array {path}: not a supported suffix array file"
+        )
+        mapping.close()
+        return None
+
+    if not matches_source(file_path, source_size, source_mtime_ns):
+        logger.warning(f"Ignoring stale suffix array {path} for {file_path}")
+        mapping.close()
+        return None
+
+    array_count = 2 if flags & SUFFIX_ARRAY_HAS_LCP else 1
+    if len(mapping) != HEADER_SIZE + array_count * count * itemsize:
+        logger.warning(f"Ignoring truncated suffix array {path}")
+        mapping.close()
+        return None
+
+    # A copy of the data file, as a mapping of it would fault if the file were rewritten
+    text = read_file(file_path) or b""
+    if len(text) != source_size:
+        logger.warning(f"Ignoring stale suffix array {path} for {file_path}")
+        mapping.close()
+        return None
+
+    dtype = np.dtype(f"<i{itemsize}")
+    suffix_array = np.frombuffer(mapping, dtype=dtype, count=count, offset=HEADER_SIZE)
+    lcp = None
+    if array_count == 2:
+        lcp = np.frombuffer(
+            mapping, dtype=dtype, count=count, offset=HEADER_SIZE + count * itemsize
+        )
+    return SuffixArrayIndex(text, suffix_array, lcp)
+
+
+def hash_index_path_for(file_path: str) -> str:
+    """
+    Return the default location of the prebuilt hash index for a data file.
+
+    :param file_path: The path to the data file.
+    :return: The path of its hash index file.
+    """
+    return file_path + HASH_INDEX_SUFFIX
+
+
+def write_hash_index(file_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Compile a data file into a prebuilt ``FlatHashIndex``. The layout is a fixed header, the
+    little-endian ``uint64`` slot table and the newline-terminated records, so worker processes
+    map it read-only and share one copy of it in the page cache.
+
+    :param file_path: The path to the data file.
+    :param output_path: Where to write the index, by default next to the data file.
+    :return: The path of the written index file.
+    """
+    output_path = output_path or hash_index_path_for(file_path)
+    signature = stat_signature(file_path)
+    index = FlatHashIndex.from_file(file_path)
+
+    slots = array("Q", index.slots)
+    if sys.byteorder != "little":
+        slots.byteswap()
+
+    header = HASH_INDEX_HEADER.pack(
+        HASH_INDEX_MAGIC,
+        HASH_INDEX_VERSION,
+        0,
+        signature.size,
+        signature.mtime_ns,
+        len(index),
+        len(slots),
+        len(index.records),
+    )
+    temporary_path = f"{output_path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        file.write(slots.tobytes())
+        file.write(index.records)
+    os.replace(temporary_path, output_path)
+
+    logger.info(
+        f"Wrote hash index of {len(index)} lines for {file_path} to {output_path}"
+    )
+    return output_path
+
+
+def load_hash_index(path: str, file_path: str) -> Optional[FlatHashIndex]:
+    """
+    Memory-map a prebuilt hash index. Nothing is read up front, so attaching takes milliseconds
+    whatever the size of the index.
+
+    :param path: The path to the hash index file.
+    :param file_path: The data file the index must match; it is rejected as stale if the data
+        file's size or modification time differ from those recorded when it was built.
+    :return: The index, or None if the file is missing, invalid or stale.
+    """
+    try:
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapping) < HASH_INDEX_HEADER.size:
+        logger.warning(f"Ignoring hash index {path}: file is too short")
+        mapping.close()
+        return None
+    (
+        magic,
+        version,
+        _,
+        source_size,
+        source_mtime_ns,
+        count,
+        slot_count,
+        records_length,
+    ) = HASH_INDEX_HEADER.unpack_from(mapping)
+    # Probing relies on the slot count being a power of two
+    if (
+        magic != HASH_INDEX_MAGIC
+        or version != HASH_INDEX_VERSION
+        or not slot_count
+        or slot_count & (slot_count - 1)
+    ):
+        logger.warning(f"Ignoring hash index {path}: not a supported hash index file")
+        mapping.close()
+        return None
+
+    if not matches_source(file_path, source_size, source_mtime_ns):
+        logger.warning(f"Ignoring stale hash index {path} for {file_path}")
+        mapping.close()
+        return None
+
+    records_start = HEADER_SIZE + slot_count * 8
+    if len(mapping) != records_start + records_length:
+        logger.warning(f"Ignoring truncated hash index {path}")
+        mapping.close()
+        return None
+
+    view = memoryview(mapping)
+    if sys.byteorder == "little":
+        slots = view[HEADER_SIZE:records_start].cast("Q")
+    else:
+        slots = array("Q")
+        slots.frombytes(view[HEADER_SIZE:records_start])
+        slots.byteswap()
+    return FlatHashIndex(view[records_start:], slots, count)
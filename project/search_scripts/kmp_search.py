@@ -1,4 +1,10 @@
 # kmp.py
+from typing import Any, Dict, Optional
+
+from project.search_scripts.engine import SearchEngine, register_engine
+from project.search_scripts.suffix_array import SuffixArrayIndex
+
+
 def compute_partial_match_table(pattern):
     """Compute the partial match table (prefix function) for KMP algorithm."""
     m = len(pattern)
@@ -23,6 +29,8 @@ def kmp_search(text, pattern, lps):
     """Perform KMP search using the precomputed partial match table."""
     n = len(text)
     m = len(pattern)
+    if m == 0:
+        return True  # The empty pattern occurs in any text, as with ``in``
     i = 0  # index for text
     j = 0  # index for pattern
 
@@ -41,44 +49,35 @@ def kmp_search(text, pattern, lps):
     return False  # No match found
 
 
-def precompute_partial_match_tables(file_path):
-    """Precompute partial match tables for each line in the file."""
-    tables = {}
-    with open(file_path, "r") as file:
-        for line in file:
-            stripped_line = line.strip()
-            tables[stripped_line] = compute_partial_match_table(stripped_line)
-    return tables
+class KMPMatcher:
+    """
+    Substring search over the file lines. Re-reading the file, each query is matched line by line
+    with KMP; otherwise the file is indexed once with a suffix array and each query is a binary
+    search over it.
 
+    :param file_path: The path to the file to be searched.
+    """
 
-class KMPMatcher:
     def __init__(self, file_path):
         self.file_path = file_path
-        self.pattern_tables = {}
+        self.index = None
         self.cached = False
 
     def initialize_cache(self):
         if not self.cached:
-            self.pattern_tables = precompute_partial_match_tables(self.file_path)
+            self.index = SuffixArrayIndex.from_file(self.file_path)
             self.cached = True
 
     def search(self, query, reread=False):
-        if reread:
-            # Compute the partial match table for the query
-            lps = compute_partial_match_table(query)
-            with open(self.file_path, "r") as file:
-                for line in file:
-                    if kmp_search(line.strip(), query, lps):
-                        return True
-        else:
-            # Use precomputed partial match tables if available
-            if query not in self.pattern_tables:
-                return False
-            lps = self.pattern_tables[query]
-            with open(self.file_path, "r") as file:
-                for line in file:
-                    if kmp_search(line.strip(), query, lps):
-                        return True
+        if not reread:
+            self.initialize_cache()
+            return query.encode("utf-8") in self.index
+        # Compute the partial match table for the query
+        lps = compute_partial_match_table(query)
+        with open(self.file_path, "r") as file:
+            for line in file:
+                if kmp_search(line.strip(), query, lps):
+                    return True
         return False
 
 
@@ -95,3 +94,34 @@ def initialize_matcher(file_path, reread_on_query):
 
 def search_string_in_file(query, reread_on_query):
     return matcher.search(query, reread_on_query)
+
+
+@register_engine("kmp")
+class KMPEngine(SearchEngine):
+    """
+    Substring search over the file lines using the Knuth-Morris-Pratt algorithm, or a suffix array
+    of the file when it is not re-read on each query.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.matcher = KMPMatcher(file_path)
+
+    def _build(self) -> None:
+        if not self.reread_on_query:
+            self.matcher.initialize_cache()
+
+    def search(self, query: str) -> bool:
+        return self.matcher.search(query, self.reread_on_query)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        if self.matcher.index is not None:
+            stats["suffixes"] = len(self.matcher.index)
+            stats["index_bytes"] = self.matcher.index.nbytes
+        return stats
@@ -1,27 +1,40 @@
 from time import perf_counter
 
+from project.search_scripts.engine import (
+    EXACT,
+    LINE_MATCHERS,
+    PREFIX,
+    SUBSTRING,
+    SearchEngine,
+    register_engine,
+)
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-def search_string_in_file(file_path: str, search_string: str) -> bool:
+def search_string_in_file(
+    file_path: str, search_string: str, match_mode: str = SUBSTRING
+) -> bool:
     """
     Search for a specific string in a file using a LINEAR SEARCH ALGORITHM. The function reads the file line by line
-    and checks if any line, stripped of leading and trailing whitespace, exactly matches the search string.
+    and checks if any line, stripped of leading and trailing whitespace, equals, starts with or contains the search
+    string, depending on the match mode.
 
     This is a linear search algorithm because it goes through each line of the file one by one and compares it to
     the search string.
 
     :param file_path: The path to the file to be searched.
     :param search_string: The string to search for within the file.
+    :param match_mode: Whether a line must equal, start with or contain the search string.
     :return: True if the search string is found in the file, False otherwise.
     """
     start_time = perf_counter()
+    matches = LINE_MATCHERS[match_mode]
     try:
         with open(file_path, "r") as file:
             for line in file:
-                if search_string in line.strip():
+                if matches(line.strip(), search_string):
                     return True
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
@@ -60,3 +73,15 @@ def read_file_contents(file_path: str) -> str:
     except Exception as e:
         logger.error(f"Unexpected error reading file: {e}")
         return ""
+
+
+@register_engine("linear")
+class LinearSearchEngine(SearchEngine):
+    """
+    Scans the file line by line on every query, in any match mode.
+    """
+
+    match_modes = (SUBSTRING, EXACT, PREFIX)
+
+    def search(self, query: str) -> bool:
+        return search_string_in_file(self.file_path, query, self.match_mode)
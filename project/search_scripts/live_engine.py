@@ -0,0 +1,156 @@
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from project.search_scripts.engine import MATCH_MODES, SearchEngine
+from project.search_scripts.file_watch import (
+    APPENDED,
+    REPLACED,
+    FileWatcher,
+    stat_signature,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LiveEngine(SearchEngine):
+    """
+    Serves queries from an engine that can be rebuilt while the server keeps running. A rebuild
+    constructs a new engine in a background thread and swaps it in with a single reference
+    assignment, so in-flight lookups finish on the old index and none of them wait for the build.
+
+    With ``watch_file`` enabled, every query also costs one ``stat`` call: the index is only
+    touched when the file's inode, size or modification time changed, lines appended to the file
+    are ingested incrementally where the engine allows it, and any other change triggers a
+    background rebuild.
+
+    :param engine_factory: Creates a new, unbuilt engine over the file.
+    :param watch_file: Whether to refresh the index when the file changes.
+    """
+
+    # Answers in whatever mode the wrapped engine was created with
+    match_modes = MATCH_MODES
+
+    def __init__(
+        self, engine_factory: Callable[[], SearchEngine], watch_file: bool = False
+    ):
+        self.engine_factory = engine_factory
+        self.engine = engine_factory()
+        super().__init__(
+            self.engine.file_path, self.engine.reread_on_query, self.engine.match_mode
+        )
+        self.name = self.engine.name
+        self.watch_file = watch_file
+        self.watcher: Optional[FileWatcher] = None
+        self.refresh_lock = threading.Lock()
+        self.reload_thread: Optional[threading.Thread] = None
+        self.appends = 0
+        self.rebuilds = 0
+        # Bumped whenever the answers may change: lines ingested or a rebuilt index swapped in
+        self.generation = 0
+
+    def _build(self) -> None:
+        # Take the signature first so changes made during the build are seen on the next query
+        if self.watch_file:
+            self.watcher = FileWatcher(self.file_path)
+        self.engine.build()
+
+    def refresh(self) -> None:
+        """
+        Bring the index up to date if the file changed since the last check.
+        """
+        if self.watcher is None or not self.watcher.changed():
+            return
+        with self.refresh_lock:
+            change, offset = self.watcher.check()
+            if change == APPENDED and self.engine.append_from(offset):
+                self.appends += 1
+                self.generation += 1
+                logger.info(
+                    f"Ingested lines appended to {self.file_path} after byte {offset}"
+                )
+                return
+        if change in (APPENDED, REPLACED):
+            self.reload()
+
+    def current_generation(self) -> Hashable:
+        """
+        Identify the data answers currently come from, refreshing the index first. Without a
+        cached index every query reads the file, so the file's signature identifies it instead.
+
+        :return: A value that changes whenever answers may change.
+        """
+        if self.reread_on_query:
+            try:
+                return stat_signature(self.file_path)
+            except OSError:
+                return None
+        self.refresh()
+        return self.generation
+
+    def reload(self) -> bool:
+        """
+        Start rebuilding the index in the background; queries keep using the current index until
+        the new one is ready.
+
+        :return: False if a rebuild is already in progress.
+        """
+        with self.refresh_lock:
+            if self.reload_thread is not None and self.reload_thread.is_alive():
+                return False
+            self.reload_thread = threading.Thread(
+                target=self._reload, name="index-reload", daemon=True
+            )
+            self.reload_thread.start()
+        logger.info(f"Rebuilding index for {self.file_path} in the background")
+        return True
+
+    def _reload(self) -> None:
+        start_time = perf_counter()
+        try:
+            watcher = FileWatcher(self.file_path) if self.watch_file else None
+            engine = self.engine_factory()
+            engine.build()
+        except Exception as e:
+            logger.error(
+                f"Failed to rebuild index for {self.file_path}, keeping the current one: {e}"
+            )
+            return
+
+        with self.refresh_lock:
+            self.watcher = watcher
+            self.engine = engine
+            self.rebuilds += 1
+            self.generation += 1
+        logger.info(
+            f"Swapped in rebuilt index for {self.file_path} after "
+            f"{(perf_counter() - start_time) * 1e3:.3f} milliseconds"
+        )
+
+    def search(self, query: str) -> bool:
+        self.refresh()
+        return self.engine.search(query)
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        self.refresh()
+        return self.engine.search_many(queries)
+
+    def prefix_search(
+        self, prefix: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        self.refresh()
+        return self.engine.prefix_search(prefix, limit)
+
+    def field_search(
+        self, pattern: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        self.refresh()
+        return self.engine.field_search(pattern, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.engine.stats()
+        stats.update(
+            watch_file=self.watch_file, appends=self.appends, rebuilds=self.rebuilds
+        )
+        return stats
@@ -0,0 +1,157 @@
+from time import perf_counter
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from project.search_scripts.engine import SearchEngine, register_engine
+from project.search_scripts.mmap_search import read_file
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Candidate start positions compared per round: small enough for the temporary arrays to stay in
+# cache and for a hit to end the scan early
+SCAN_CHUNK_SIZE = 1 << 18
+# Bytes from the start of the file used to estimate how common each byte is
+SAMPLE_SIZE = 1 << 16
+
+
+def load_file_array(file_path: str) -> Optional[np.ndarray]:
+    """
+    Memory-map a file read-only as an array of bytes.
+
+    :param file_path: The path to the file to be mapped.
+    :return: The ``uint8`` array, empty for an empty file, or None if the file cannot be read.
+    """
+    try:
+        return np.memmap(file_path, dtype=np.uint8, mode="r")
+    except ValueError:
+        # Empty files cannot be mapped
+        return np.empty(0, dtype=np.uint8)
+    except FileNotFoundError:
+        logger.error(f"File not found: {file_path}")
+        return None
+    except OSError as e:
+        logger.error(f"IO error: {e}")
+        return None
+
+
+def read_file_array(file_path: str) -> np.ndarray:
+    """
+    Read a file into memory as an array of bytes, a copy that, unlike a mapping, stays readable
+    however the file is rewritten later.
+
+    :param file_path: The path to the file to be read.
+    :return: The ``uint8`` array, empty for an empty or unreadable file.
+    """
+    return np.frombuffer(read_file(file_path) or b"", dtype=np.uint8)
+
+
+def rarest_first(pattern: bytes, data: np.ndarray) -> List[int]:
+    """
+    Order the offsets of a pattern by how rare their byte is at the start of the text, so the
+    first comparisons leave the fewest candidates.
+
+    :param pattern: The encoded pattern.
+    :param data: The text.
+    :return: The offsets into the pattern, rarest byte first.
+    """
+    counts = np.bincount(data[:SAMPLE_SIZE], minlength=256)
+    return sorted(range(len(pattern)), key=lambda offset: counts[pattern[offset]])
+
+
+def find_in_array(data: np.ndarray, pattern: bytes) -> bool:
+    """
+    Search a text for a pattern with vectorized comparisons, a chunk at a time. The positions
+    where the pattern's two rarest bytes both fall in place are found with two array comparisons,
+    and each further byte of the pattern only filters the surviving candidates, so little is left
+    to check after the first bytes. Queries never contain a newline, so any hit lies within a
+    single line.
+
+    :param data: The text, as a ``uint8`` array.
+    :param pattern: The non-empty encoded pattern.
+    :return: True if the pattern occurs in the text, False otherwise.
+    """
+    length = len(pattern)
+    last_start = len(data) - length + 1
+    order = rarest_first(pattern, data)
+    for start in range(0, max(last_start, 0), SCAN_CHUNK_SIZE):
+        stop = min(start + SCAN_CHUNK_SIZE, last_start)
+        in_place = data[start + order[0] : stop + order[0]] == pattern[order[0]]
+        if length > 1:
+            in_place &= data[start + order[1] : stop + order[1]] == pattern[order[1]]
+        candidates = np.flatnonzero(in_place) + start
+        for offset in order[2:]:
+            if not len(candidates):
+                break
+            candidates = candidates[data[candidates + offset] == pattern[offset]]
+        if len(candidates):
+            return True
+    return False
+
+
+def search_bytes_in_array(data: Optional[np.ndarray], search_bytes: bytes) -> bool:
+    """
+    Search the bytes of a file for a query, as the line-by-line linear search would.
+
+    :param data: The file as a ``uint8`` array, or None if it could not be read.
+    :param search_bytes: The encoded query.
+    :return: True if the query occurs in the file, False otherwise.
+    """
+    if data is None or b"\n" in search_bytes:
+        return False
+    if not search_bytes:
+        # The empty string occurs in any line
+        return len(data) > 0
+    return find_in_array(data, search_bytes)
+
+
+def search_string_in_file(file_path: str, search_string: str) -> bool:
+    """
+    Search for a specific string in a file mapped as a NumPy array.
+
+    :param file_path: The path to the file to be searched.
+    :param search_string: The string to search for within the file.
+    :return: True if the search string is found in the file, False otherwise.
+    """
+    start_time = perf_counter()
+    try:
+        return search_bytes_in_array(
+            load_file_array(file_path), search_string.encode("utf-8")
+        )
+    finally:
+        execution_time = (perf_counter() - start_time) * 1e3  # Convert to milliseconds
+        logger.debug(
+            f"numpy search_string_in_file execution time: {execution_time:.3f} milliseconds"
+        )
+
+
+@register_engine("numpy_scan")
+class NumpyScanEngine(SearchEngine):
+    """
+    Substring search with vectorized NumPy comparisons over a memory mapping of the file. When the
+    file is not re-read on each query, a copy of its bytes read at build time is searched instead.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.data: Optional[np.ndarray] = None
+
+    def _build(self) -> None:
+        if not self.reread_on_query:
+            self.data = read_file_array(self.file_path)
+
+    def search(self, query: str) -> bool:
+        if self.reread_on_query:
+            return search_string_in_file(self.file_path, query)
+        return search_bytes_in_array(self.data, query.encode("utf-8"))
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        # Map the file once for the whole batch
+        data = load_file_array(self.file_path) if self.reread_on_query else self.data
+        return [search_bytes_in_array(data, query.encode("utf-8")) for query in queries]
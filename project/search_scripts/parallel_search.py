@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config.settings import get_settings
+from project.search_scripts.engine import SearchEngine, register_engine
+from project.search_scripts.mmap_search import map_file
+from utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Files smaller than this are scanned in-process; below it the pool round trip costs more
+MIN_CHUNK_SIZE = 1 << 20
+# Chunks per process, so pending chunks can still be cancelled once one of them matches
+CHUNKS_PER_PROCESS = 4
+
+
+@lru_cache(maxsize=1)
+def get_scan_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    Return the process pool shared by every parallel scan engine, so reloads reuse the workers.
+    Workers are spawned rather than forked, as the server process runs threads.
+
+    :param processes: Number of worker processes.
+    :return: The process pool.
+    """
+    return ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def discard_scan_pool(pool: ProcessPoolExecutor, processes: int) -> None:
+    """
+    Drop a pool one of whose workers died, so the next scan starts a fresh one instead of failing
+    on the broken pool for the life of the process.
+
+    :param pool: The broken pool.
+    :param processes: Number of worker processes it was created with.
+    :return: None
+    """
+    # Another scan may have replaced it already
+    if get_scan_pool(processes) is pool:
+        get_scan_pool.cache_clear()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def default_scan_processes() -> int:
+    """
+    Return the number of scan workers to start when ``scan_processes`` is 0: one per core, shared
+    out between the server processes when pre-forked so they do not oversubscribe the cores.
+
+    :return: Number of worker processes.
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, settings.worker_processes))
+
+
+def split_newline_aligned(file_path: str, chunk_count: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges that start and end on line boundaries, so no line, and hence no
+    match of a query, straddles two ranges.
+
+    :param file_path: The path to the file.
+    :param chunk_count: The number of ranges wanted.
+    :return: ``(start, end)`` byte ranges covering the file, possibly fewer than requested.
+    """
+    mapping = map_file(file_path)
+    if mapping is None:
+        return []
+    try:
+        size = len(mapping)
+        ranges = []
+        start = 0
+        for i in range(1, chunk_count + 1):
+            if start >= size:
+                break
+            end = size if i == chunk_count else max(start, size * i // chunk_count)
+            if end < size:
+                newline = mapping.find(b"\n", end)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+        return ranges
+    finally:
+        mapping.close()
+
+
+def scan_range(file_path: str, search_bytes: bytes, start: int, end: int) -> bool:
+    """
+    Search one byte range of a file. Runs in the worker processes.
+
+    :param file_path: The path to the file.
+    :param search_bytes: The encoded query.
+    :param start: The first byte of the range.
+    :param end: The byte after the last one of the range.
+    :return: True if the query occurs within the range.
+    """
+    mapping = map_file(file_path)
+    if mapping is None:
+        return False
+    try:
+        return mapping.find(search_bytes, start, end) != -1
+    finally:
+        mapping.close()
+
+
+@register_engine("parallel_scan")
+class ParallelScanEngine(SearchEngine):
+    """
+    Substring search that re-reads the file on every query, split into newline-aligned byte
+    ranges scanned concurrently by a persistent process pool. The search returns as soon as one
+    range matches and cancels the ranges not yet started, so a single query on a large file uses
+    every core. If a pool worker dies, the query is scanned in-process and the pool replaced.
+    """
+
+    min_chunk_size = MIN_CHUNK_SIZE
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.processes = settings.scan_processes or default_scan_processes()
+
+    def _build(self) -> None:
+        # Start the workers now rather than on the first query
+        get_scan_pool(self.processes)
+
+    def search(self, query: str) -> bool:
+        start_time = perf_counter()
+        search_bytes = query.encode("utf-8")
+        try:
+            size = os.path.getsize(self.file_path)
+        except OSError as e:
+            logger.error(f"IO error: {e}")
+            return False
+
+        chunk_count = min(
+            self.processes * CHUNKS_PER_PROCESS, size // self.min_chunk_size
+        )
+        if chunk_count <= 1 or self.processes == 1:
+            return scan_range(self.file_path, search_bytes, 0, size)
+
+        pool = get_scan_pool(self.processes)
+        pending: Set[Future] = set()
+        try:
+            for start, end in split_newline_aligned(self.file_path, chunk_count):
+                pending.add(
+                    pool.submit(scan_range, self.file_path, search_bytes, start, end)
+                )
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if any(future.result() for future in done):
+                    return True
+            return False
+        except BrokenProcessPool as e:
+            logger.warning(
+                f"Scan pool broken, scanning in-process and restarting it: {e}"
+            )
+            discard_scan_pool(pool, self.processes)
+            return scan_range(self.file_path, search_bytes, 0, size)
+        finally:
+            for future in pending:
+                future.cancel()
+            logger.debug(
+                f"parallel scan of {chunk_count} chunks: "
+                f"{(perf_counter() - start_time) * 1e3:.3f} milliseconds"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["processes"] = self.processes
+        return stats
@@ -0,0 +1,558 @@
+import io
+from functools import cached_property
+from itertools import chain, islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from project.search_scripts.engine import EXACT, SearchEngine, register_engine
+from project.search_scripts.file_watch import iter_lines_from
+
+# Records are up to MAX_FIELDS semicolon-terminated integers below 2 ** FIELD_BITS, packed into
+# one uint64 with the field count in the top bits
+FIELD_BITS = 5
+MAX_FIELDS = 12
+FIELD_LIMIT = 1 << FIELD_BITS
+COUNT_SHIFT = FIELD_BITS * MAX_FIELDS
+FIELD_MASK = FIELD_LIMIT - 1
+WILDCARD = b"*"
+# Bytes of lines encoded at a time. The temporaries of ``encode_records`` are a few times this
+# size: 1MB chunks kept a build from a 22MB, 1M-line file at a 30MB peak, against 830MB when the
+# whole file was encoded at once, and no slower
+ENCODE_CHUNK_SIZE = 1 << 20
+
+
+def encode_record(line: bytes) -> Optional[int]:
+    """
+    Pack a line such as ``13;0;23;11;0;16;5;0;`` into an integer key. Only the canonical spelling
+    of each number is accepted, so two lines share a key exactly when they are equal.
+
+    :param line: The line, stripped of surrounding whitespace.
+    :return: The key, or None if the line does not fit the record schema.
+    """
+    if not line.endswith(b";"):
+        return None
+    fields = line[:-1].split(b";")
+    if len(fields) > MAX_FIELDS:
+        return None
+    key = len(fields) << COUNT_SHIFT
+    for position, field in enumerate(fields):
+        if not field.isdigit() or (len(field) > 1 and field[0] == ord("0")):
+            return None
+        value = int(field)
+        if value >= FIELD_LIMIT:
+            return None
+        key |= value << (FIELD_BITS * position)
+    return key
+
+
+def decode_record(key: int) -> bytes:
+    """
+    Spell out the line a key was packed from.
+
+    :param key: The key returned by ``encode_record``.
+    :return: The line.
+    """
+    shifts = range(0, FIELD_BITS * (key >> COUNT_SHIFT), FIELD_BITS)
+    return b"".join(b"%d;" % ((key >> shift) & FIELD_MASK) for shift in shifts)
+
+
+def parse_field_pattern(pattern: bytes) -> List[Optional[bytes]]:
+    """
+    Split a field pattern such as ``13;*;23;*;0;*;*;0;`` into its fields, ``*`` matching any
+    single field.
+
+    :param pattern: The pattern, with every field terminated by a semicolon.
+    :return: Each field of the pattern, None for a wildcard.
+    :raises ValueError: If the pattern is empty or does not end with a semicolon.
+    """
+    if not pattern.endswith(b";"):
+        raise ValueError("field patterns must end with ';'")
+    return [None if field == WILDCARD else field for field in pattern[:-1].split(b";")]
+
+
+def match_fields(line: bytes, fields: List[Optional[bytes]]) -> bool:
+    """
+    Check a line against a parsed field pattern field by field.
+
+    :param line: The line, stripped of surrounding whitespace.
+    :param fields: The pattern, as returned by ``parse_field_pattern``.
+    :return: True if the line has as many fields and agrees on every one that is not a wildcard.
+    """
+    if not line.endswith(b";"):
+        return False
+    values = line[:-1].split(b";")
+    return len(values) == len(fields) and all(
+        field is None or field == value for field, value in zip(fields, values)
+    )
+
+
+def pattern_key(fields: List[Optional[bytes]]) -> Optional[Tuple[int, int]]:
+    """
+    Pack a parsed field pattern into a key and a mask, so a packed record matches it exactly when
+    ``record & mask == key``: the mask covers the field count and every literal field.
+
+    :param fields: The pattern, as returned by ``parse_field_pattern``.
+    :return: The key and the mask, or None if no packed record can match the pattern.
+    """
+    if not 0 < len(fields) <= MAX_FIELDS:
+        return None
+    key = len(fields) << COUNT_SHIFT
+    mask = ((1 << 64) - 1) ^ ((1 << COUNT_SHIFT) - 1)
+    for position, field in enumerate(fields):
+        if field is None:
+            continue
+        value = encode_record(field + b";")
+        if value is None:
+            # Only the canonical spelling of a number is ever packed
+            return None
+        key |= (value & FIELD_MASK) << (FIELD_BITS * position)
+        mask |= FIELD_MASK << (FIELD_BITS * position)
+    return key, mask
+
+
+def encode_records(
+    text: bytes,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized ``encode_record`` over a buffer of newline-terminated lines. Every byte is
+    classified at once, each semicolon yields the field ending at it, read from the at most two
+    digits before it, and the shifted fields of each line are summed with ``np.add.reduceat``. No
+    whitespace is stripped, so lines with surrounding whitespace come back as not fitting. The
+    per-byte temporaries are ``bool``, ``uint8`` or ``int32``, so the buffer should be at most a
+    few megabytes, as from ``iter_line_chunks``.
+
+    :param text: The lines, each terminated by a newline.
+    :return: The key of each line, whether each line fits the schema, and the start and end
+        offsets of each line.
+    """
+    data = np.frombuffer(text, dtype=np.uint8)
+    is_newline = data == ord("\n")
+    ends = np.flatnonzero(is_newline)
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    line_count = len(ends)
+    keys = np.zeros(line_count, dtype=np.uint64)
+    if line_count == 0:
+        return keys, np.zeros(0, dtype=bool), starts, ends
+
+    invalid = np.zeros(line_count, dtype=bool)
+    # Every line must be non-empty and end with a semicolon
+    invalid |= ends == starts
+    invalid |= data[np.maximum(ends - 1, 0)] != ord(";")
+    is_semicolon = data == ord(";")
+    # Digits, semicolons and newlines are the only bytes a record may contain
+    stray = np.flatnonzero(((data - ord("0")) > 9) & ~is_semicolon & ~is_newline)
+    invalid[np.searchsorted(ends, stray)] = True
+    del is_newline
+
+    semicolons = np.flatnonzero(is_semicolon)
+    del is_semicolon
+    semicolon_line = np.searchsorted(ends, semicolons).astype(np.int32)
+    # The bytes before a semicolon at the start of the text read as newlines
+    before = [
+        np.where(semicolons >= back, data[np.maximum(semicolons - back, 0)], ord("\n"))
+        for back in (1, 2, 3)
+    ]
+    # Digit values, 10 or more for any other byte
+    last, second, third = (byte - np.uint8(ord("0")) for byte in before)
+    last_digit = last <= 9
+    second_digit = second <= 9
+    third_digit = (third <= 9) & second_digit
+    values = np.where(last_digit, last, 0) + np.where(
+        second_digit, second * np.uint8(10), 0
+    )
+    bad_field = ~last_digit | third_digit | (second_digit & (second == 0))
+    bad_field |= values >= FIELD_LIMIT
+    invalid[semicolon_line[bad_field]] = True
+
+    field_counts = np.bincount(semicolon_line, minlength=line_count)
+    invalid |= field_counts > MAX_FIELDS
+    first_field = np.searchsorted(semicolons, starts)
+    positions = np.arange(len(semicolons), dtype=np.int32) - first_field[semicolon_line]
+    shifts = (np.minimum(positions, MAX_FIELDS - 1) * FIELD_BITS).astype(np.uint64)
+    shifted = np.where(bad_field, 0, values).astype(np.uint64) << shifts
+    has_fields = field_counts > 0
+    if len(semicolons):
+        keys[has_fields] = np.add.reduceat(shifted, first_field[has_fields])
+    keys |= np.minimum(field_counts, MAX_FIELDS).astype(np.uint64) << np.uint64(
+        COUNT_SHIFT
+    )
+    keys[invalid] = 0
+    return keys, ~invalid, starts, ends
+
+
+def iter_line_chunks(
+    file: IO[bytes], chunk_size: int = ENCODE_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Read a file in chunks of whole lines.
+
+    :param file: The file, opened in binary mode.
+    :param chunk_size: The number of bytes read at a time, before completing the last line.
+    :return: An iterator over the chunks, each ending with a newline.
+    """
+    while chunk := file.read(chunk_size):
+        if not chunk.endswith(b"\n"):
+            chunk += file.readline()
+        if not chunk.endswith(b"\n"):
+            chunk += b"\n"
+        yield chunk
+
+
+def iter_encoded_chunks(
+    file: IO[bytes], chunk_size: int = ENCODE_CHUNK_SIZE
+) -> Iterator[Tuple[np.ndarray, List[bytes]]]:
+    """
+    Encode the lines of a file a chunk at a time: each chunk is parsed in bulk, and only the lines
+    that do not fit the schema as they stand are stripped and parsed one by one.
+
+    :param file: The file, opened in binary mode.
+    :param chunk_size: The number of bytes read at a time, before completing the last line.
+    :return: An iterator over the keys of each chunk's fitting lines, in file order, with the
+        chunk's stripped lines that do not fit the schema.
+    """
+    for chunk in iter_line_chunks(file, chunk_size):
+        keys, valid, starts, ends = encode_records(chunk)
+        extra_keys = []
+        fallback = []
+        for start, end in zip(starts[~valid].tolist(), ends[~valid].tolist()):
+            line = chunk[start:end].strip()
+            key = encode_record(line)
+            if key is None:
+                fallback.append(line)
+            else:
+                extra_keys.append(key)
+        yield np.concatenate(
+            (keys[valid], np.array(extra_keys, dtype=np.uint64))
+        ), fallback
+
+
+def scan_records(file: IO[bytes], lines: List[bytes]) -> List[bool]:
+    """
+    Check many lines against a file without indexing it: the lines are encoded once and every
+    chunk's keys are tested for them with ``np.isin``, stopping once all of them are found.
+
+    :param file: The file, opened in binary mode.
+    :param lines: The encoded lines, stripped and without newlines.
+    :return: One boolean per line, in order.
+    """
+    if not lines:
+        return []
+    keys, valid, _, _ = encode_records(b"\n".join(lines) + b"\n")
+    found = np.zeros(len(lines), dtype=bool)
+    fits = valid.tolist()
+    # The lines outside the schema not seen in the file so far
+    missing = {line for line, packed in zip(lines, fits) if not packed}
+    for chunk_keys, fallback in iter_encoded_chunks(file):
+        found |= valid & np.isin(keys, chunk_keys)
+        missing.difference_update(fallback)
+        if found.sum() == valid.sum() and not missing:
+            break
+    found = found.tolist()
+    return [
+        hit if fits else line not in missing
+        for line, fits, hit in zip(lines, fits, found)
+    ]
+
+
+def scan_fields(
+    file: IO[bytes], fields: List[Optional[bytes]]
+) -> Tuple[np.ndarray, List[bytes]]:
+    """
+    Find the lines of a file matching a field pattern without indexing it: every chunk's keys are
+    tested against the pattern's key and mask.
+
+    :param file: The file, opened in binary mode.
+    :param fields: The pattern, as returned by ``parse_field_pattern``.
+    :return: The distinct matching keys in ascending order, and the distinct matching lines
+        outside the schema, sorted.
+    """
+    packed = pattern_key(fields)
+    matches = []
+    fallback = set()
+    for chunk_keys, chunk_fallback in iter_encoded_chunks(file):
+        if packed is not None:
+            key, mask = packed
+            matches.append(chunk_keys[(chunk_keys & np.uint64(mask)) == np.uint64(key)])
+        fallback.update(line for line in chunk_fallback if match_fields(line, fields))
+    keys = (
+        np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.uint64)
+    )
+    return keys, sorted(fallback)
+
+
+class PackedRecordIndex:
+    """
+    Exact-match index of structured records: every line fitting the schema is a ``uint64`` key in
+    one sorted NumPy array, eight bytes per distinct line, and lookups are ``np.searchsorted``
+    calls. The few lines that do not fit are kept as strings in a set.
+
+    :param keys: The sorted, distinct keys.
+    :param fallback: The lines that do not fit the schema.
+    """
+
+    def __init__(self, keys: np.ndarray, fallback: Set[bytes]):
+        self.keys = keys
+        self.fallback = fallback
+
+    @classmethod
+    def from_text(cls, text: bytes) -> "PackedRecordIndex":
+        """
+        Build the index from a buffer of lines.
+
+        :param text: The lines, separated by newlines.
+        :return: The index.
+        """
+        return cls.from_stream(io.BytesIO(text))
+
+    @classmethod
+    def from_stream(cls, file: IO[bytes]) -> "PackedRecordIndex":
+        """
+        Build the index from a binary file, encoded a chunk at a time, so only the keys of the
+        whole file are held at once before they are sorted.
+
+        :param file: The file, opened in binary mode.
+        :return: The index.
+        """
+        keys = []
+        fallback = set()
+        for chunk_keys, chunk_fallback in iter_encoded_chunks(file):
+            keys.append(chunk_keys)
+            fallback.update(chunk_fallback)
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.uint64)
+        return cls(np.unique(keys), fallback)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes]) -> "PackedRecordIndex":
+        """
+        Build the index from raw lines.
+
+        :param lines: The lines, stripped of surrounding whitespace.
+        :return: The index.
+        """
+        return cls.from_text(b"".join(line + b"\n" for line in lines))
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "PackedRecordIndex":
+        """
+        Build the index from the lines of a file.
+
+        :param file_path: The path to the file to be indexed.
+        :return: The index.
+        """
+        with open(file_path, "rb") as file:
+            return cls.from_stream(file)
+
+    def contains_many(self, lines: List[bytes]) -> List[bool]:
+        """
+        Check many lines at once: the lines are encoded in bulk, the keys looked up with one
+        vectorized binary search, and only the lines outside the schema touch the fallback set.
+
+        :param lines: The encoded lines, stripped and without newlines.
+        :return: One boolean per line, in order.
+        """
+        if not lines:
+            return []
+        keys, valid, _, _ = encode_records(b"\n".join(lines) + b"\n")
+        if len(self.keys):
+            positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+            found = (valid & (self.keys[positions] == keys)).tolist()
+        else:
+            found = [False] * len(lines)
+        return [
+            hit if fits else line in self.fallback
+            for line, fits, hit in zip(lines, valid.tolist(), found)
+        ]
+
+    @cached_property
+    def postings(self) -> "FieldPostings":
+        """
+        The per-field posting lists of the keys, built on the first field query.
+        """
+        return FieldPostings(self.keys)
+
+    def match_fields(
+        self, fields: List[Optional[bytes]]
+    ) -> Tuple[np.ndarray, List[bytes]]:
+        """
+        Find the lines matching a field pattern.
+
+        :param fields: The pattern, as returned by ``parse_field_pattern``.
+        :return: The matching keys in ascending order, and the matching lines outside the schema.
+        """
+        fallback = sorted(line for line in self.fallback if match_fields(line, fields))
+        return self.keys[self.postings.match(fields)], fallback
+
+    def __contains__(self, line: bytes) -> bool:
+        key = encode_record(line)
+        if key is None:
+            return line in self.fallback
+        position = int(np.searchsorted(self.keys, np.uint64(key)))
+        return position < len(self.keys) and int(self.keys[position]) == key
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.fallback)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the key array and the fallback lines.
+        """
+        return self.keys.nbytes + sum(len(line) for line in self.fallback)
+
+
+class FieldPostings:
+    """
+    Inverted index of packed records by field: for every field position, the ids of the records,
+    their positions in the sorted key array, grouped by the value of that field. The groups of a
+    position are slices of one ``uint32`` array, sorted by id, with ``offsets`` marking where each
+    value's group starts. Keys are ordered by their field count first, so the records with a given
+    number of fields are one contiguous range of ids, and a pattern only intersects the groups of
+    its literal fields within that range, smallest first, by binary search.
+
+    :param keys: The sorted, distinct keys.
+    """
+
+    def __init__(self, keys: np.ndarray):
+        self.keys = keys
+        self.ids: List[np.ndarray] = []
+        self.offsets: List[np.ndarray] = []
+        counts = (keys >> np.uint64(COUNT_SHIFT)).astype(np.int64)
+        # First id of the records with each field count, ending with the number of records
+        self.count_starts = np.searchsorted(counts, np.arange(MAX_FIELDS + 2))
+        for position in range(MAX_FIELDS):
+            # Only the records with more fields than the position have a value there
+            first = int(self.count_starts[position + 1])
+            values = (keys[first:] >> np.uint64(FIELD_BITS * position)) & np.uint64(
+                FIELD_MASK
+            )
+            values = values.astype(np.int64)
+            self.ids.append(
+                (np.argsort(values, kind="stable") + first).astype(np.uint32)
+            )
+            self.offsets.append(
+                np.concatenate(
+                    ([0], np.cumsum(np.bincount(values, minlength=FIELD_LIMIT)))
+                )
+            )
+
+    def match(self, fields: List[Optional[bytes]]) -> np.ndarray:
+        """
+        Find the records matching a field pattern.
+
+        :param fields: The pattern, as returned by ``parse_field_pattern``.
+        :return: The ids of the matching records in ascending order.
+        """
+        if not 0 < len(fields) <= MAX_FIELDS:
+            return np.empty(0, dtype=np.uint32)
+        low = int(self.count_starts[len(fields)])
+        high = int(self.count_starts[len(fields) + 1])
+        groups = []
+        for position, field in enumerate(fields):
+            if field is None:
+                continue
+            key = encode_record(field + b";")
+            if key is None:
+                # Only the canonical spelling of a number is ever packed
+                return np.empty(0, dtype=np.uint32)
+            value = key & FIELD_MASK
+            offsets = self.offsets[position]
+            ids = self.ids[position][offsets[value] : offsets[value + 1]]
+            groups.append(ids[np.searchsorted(ids, low) : np.searchsorted(ids, high)])
+        if not groups:
+            return np.arange(low, high, dtype=np.uint32)
+        groups.sort(key=len)
+        matches = groups[0]
+        for ids in groups[1:]:
+            if not len(matches):
+                break
+            positions = np.minimum(np.searchsorted(ids, matches), len(ids) - 1)
+            matches = matches[ids[positions] == matches]
+        return matches
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the posting lists.
+        """
+        return sum(ids.nbytes for ids in self.ids) + sum(
+            offsets.nbytes for offsets in self.offsets
+        )
+
+
+@register_engine("packed_records")
+class PackedRecordEngine(SearchEngine):
+    """
+    Exact line matching for files of semicolon-separated small integers, against sorted packed
+    integer keys rather than strings. Lines appended while the file is watched are kept in a set
+    beside the array until the next rebuild.
+    """
+
+    match_modes = (EXACT,)
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.index: Optional[PackedRecordIndex] = None
+        self.appended: Set[bytes] = set()
+
+    def _build(self) -> None:
+        if not self.reread_on_query:
+            self.index = PackedRecordIndex.from_file(self.file_path)
+
+    def append_from(self, offset: int) -> bool:
+        if self.index is None:
+            return False
+        self.appended.update(
+            line.encode("utf-8") for line in iter_lines_from(self.file_path, offset)
+        )
+        return True
+
+    def search(self, query: str) -> bool:
+        return self.search_many([query])[0]
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        lines = [query.encode("utf-8") for query in queries]
+        if self.reread_on_query:
+            # Scan the file for the queried keys rather than indexing it for one batch
+            with open(self.file_path, "rb") as file:
+                return scan_records(file, lines)
+        found = self.index.contains_many(lines)
+        if self.appended:
+            found = [hit or line in self.appended for line, hit in zip(lines, found)]
+        return found
+
+    def field_search(
+        self, pattern: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        fields = parse_field_pattern(pattern.encode("utf-8"))
+        if self.reread_on_query:
+            with open(self.file_path, "rb") as file:
+                keys, fallback = scan_fields(file, fields)
+            appended = []
+        elif self.index is None:
+            return 0, []
+        else:
+            keys, fallback = self.index.match_fields(fields)
+            appended = sorted(
+                line
+                for line in self.appended
+                if match_fields(line, fields) and line not in self.index
+            )
+        count = len(keys) + len(fallback) + len(appended)
+        lines = (decode_record(key) for key in keys[:limit].tolist())
+        lines = islice(chain(lines, fallback, appended), limit)
+        return count, [line.decode("utf-8", errors="ignore") for line in lines]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        if self.index is not None:
+            stats["records"] = len(self.index.keys)
+            stats["fallback_lines"] = len(self.index.fallback)
+            stats["index_bytes"] = self.index.nbytes
+            stats["appended_lines"] = len(self.appended)
+        return stats
@@ -0,0 +1,144 @@
+from typing import List, Optional
+
+# Importing the algorithm modules registers their engines
+from project.search_scripts import (  # noqa: F401
+    aho_corasick_search,
+    boyer_moore_search,
+    hash_set_search,
+    kmp_search,
+    linear_search,
+    mmap_search,
+    numpy_search,
+    parallel_search,
+    record_search,
+    sorted_array_search,
+    suffix_array_search,
+    trie_search,
+)
+from project.search_scripts.bloom_filter import FILTERED_ENGINES, BloomFilteredEngine
+from project.search_scripts.engine import (
+    ENGINES,
+    EXACT,
+    MATCH_MODES,
+    PREFIX,
+    SUBSTRING,
+    SearchEngine,
+)
+from project.search_scripts.live_engine import LiveEngine
+from project.search_scripts.result_cache import CachedEngine, ResultCache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+AUTO_ENGINE = "auto"
+# Match mode -> engine picked by ``auto`` when the file is not re-read on each query
+AUTO_CACHED_ENGINES = {EXACT: "hash_set", PREFIX: "trie", SUBSTRING: "mmap"}
+
+
+def available_engines() -> List[str]:
+    """
+    List the names of all registered search engines.
+
+    :return: The sorted engine names.
+    """
+    return sorted(ENGINES)
+
+
+def resolve_engine_name(
+    name: str, reread_on_query: bool, match_mode: Optional[str] = None
+) -> str:
+    """
+    Resolve the configured algorithm name to a registered engine. ``auto`` scans the file linearly
+    when re-reading on each query; otherwise it picks the fastest cached index answering the match
+    mode, and without a match mode keeps the original choice of the hash set.
+
+    :param name: The configured search algorithm.
+    :param reread_on_query: Whether the file is to be read again for every query.
+    :param match_mode: The match mode the engine must answer, if any.
+    :return: The name of a registered engine.
+    """
+    if match_mode is not None and match_mode not in MATCH_MODES:
+        raise ValueError(
+            f"Unknown match mode '{match_mode}', expected one of: {', '.join(MATCH_MODES)}"
+        )
+    if name == AUTO_ENGINE:
+        if reread_on_query:
+            return "linear"
+        return AUTO_CACHED_ENGINES.get(match_mode, "hash_set")
+    if name not in ENGINES:
+        raise ValueError(
+            f"Unknown search algorithm '{name}', expected one of: "
+            f"{', '.join([AUTO_ENGINE] + available_engines())}"
+        )
+    return name
+
+
+def create_engine(
+    name: str,
+    file_path: str,
+    reread_on_query: bool,
+    watch_file: bool = False,
+    bloom_false_positive_rate: Optional[float] = None,
+    match_mode: Optional[str] = None,
+    result_cache_size: int = 0,
+    result_cache_ttl: float = 0.0,
+) -> SearchEngine:
+    """
+    Create and build the search engine selected by name, wrapped so it can be reloaded while
+    serving.
+
+    :param name: The configured search algorithm.
+    :param file_path: The path to the file to be searched.
+    :param reread_on_query: Whether the file is to be read again for every query.
+    :param watch_file: Whether to serve from a cached index that is refreshed only when the file
+        changes. Takes precedence over ``reread_on_query``.
+    :param bloom_false_positive_rate: If set, put a Bloom filter with this false-positive rate in
+        front of a cached engine in ``FILTERED_ENGINES`` to answer misses without searching.
+    :param match_mode: How queries match lines (exact, prefix or substring), by default the
+        engine's own mode.
+    :param result_cache_size: If positive, answer repeated queries from an LRU cache of this many
+        results, invalidated whenever the answers may change.
+    :param result_cache_ttl: Seconds a cached result stays valid, or 0 for no expiry.
+    :return: A built search engine.
+    :raises ValueError: If the engine is unknown or does not support the match mode.
+    """
+    if watch_file:
+        reread_on_query = False
+    engine_class = ENGINES[resolve_engine_name(name, reread_on_query, match_mode)]
+    match_mode = match_mode or engine_class.match_modes[0]
+    if match_mode not in engine_class.match_modes:
+        raise ValueError(
+            f"The {engine_class.name} engine does not support {match_mode} matching, only: "
+            f"{', '.join(engine_class.match_modes)}"
+        )
+
+    if bloom_false_positive_rate is not None and (
+        reread_on_query or match_mode != EXACT
+    ):
+        logger.warning(
+            f"Bloom filter disabled: it needs a cached engine in exact match mode, not "
+            f"{engine_class.name} in {match_mode} mode with reread_on_query={reread_on_query}"
+        )
+        bloom_false_positive_rate = None
+    elif (
+        bloom_false_positive_rate is not None
+        and engine_class.name not in FILTERED_ENGINES
+    ):
+        logger.warning(
+            f"Bloom filter disabled: {engine_class.name} lookups cost less than probing the "
+            f"filter, which only helps {', '.join(FILTERED_ENGINES)}"
+        )
+        bloom_false_positive_rate = None
+
+    def engine_factory() -> SearchEngine:
+        engine = engine_class(file_path, reread_on_query, match_mode)
+        if bloom_false_positive_rate is None:
+            return engine
+        return BloomFilteredEngine(engine, bloom_false_positive_rate)
+
+    engine = LiveEngine(engine_factory, watch_file)
+    engine.build()
+    if result_cache_size > 0:
+        engine = CachedEngine(engine, ResultCache(result_cache_size, result_cache_ttl))
+    logger.info(f"Search engine ready: {engine.stats()}")
+    return engine
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from project.search_scripts.engine import MATCH_MODES, SearchEngine
+from project.search_scripts.live_engine import LiveEngine
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of query results, each entry tagged with the generation of the data it
+    was computed from. Looking up a different generation than the cached one drops every entry at
+    once, so a changed file never serves stale answers.
+
+    :param max_entries: The number of results kept; the least recently used is evicted beyond it.
+    :param ttl: Seconds a result stays valid, or 0 to keep results until evicted or invalidated.
+    """
+
+    def __init__(self, max_entries: int, ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self.generation: Hashable = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_generation(self, generation: Hashable) -> None:
+        if generation != self.generation:
+            if self.entries:
+                self.invalidations += 1
+                self.entries.clear()
+            self.generation = generation
+
+    def get(self, query: str, generation: Hashable) -> Optional[bool]:
+        """
+        Look up the cached result of a query.
+
+        :param query: The query string.
+        :param generation: The generation of the data answers currently come from.
+        :return: The cached result, or None on a miss.
+        """
+        with self.lock:
+            self._check_generation(generation)
+            entry = self.entries.get(query)
+            if entry is not None and self.ttl and entry[1] <= time.monotonic():
+                del self.entries[query]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(query)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, query: str, generation: Hashable, result: bool) -> None:
+        """
+        Store the result of a query.
+
+        :param query: The query string.
+        :param generation: The generation of the data the result was computed from.
+        :param result: Whether the query was found.
+        """
+        with self.lock:
+            # A result computed before the data changed replaces the newer entries, which the
+            # next lookup drops again, so entries always match the generation they are kept for
+            self._check_generation(generation)
+            self.entries[query] = (result, time.monotonic() + self.ttl)
+            self.entries.move_to_end(query)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the cache for logging and benchmarking.
+
+        :return: A dictionary of cache statistics.
+        """
+        with self.lock:
+            return {
+                "cache_entries": len(self.entries),
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_evictions": self.evictions,
+                "cache_expirations": self.expirations,
+                "cache_invalidations": self.invalidations,
+            }
+
+
+class CachedEngine(SearchEngine):
+    """
+    Answers repeated queries from a ``ResultCache`` without running the engine. Entries are
+    dropped whenever the live engine ingests lines or swaps in a rebuilt index, or, when the file
+    is re-read on each query, whenever the file's signature changes.
+
+    :param engine: The live engine answering cache misses.
+    :param cache: The cache of results.
+    """
+
+    match_modes = MATCH_MODES
+
+    def __init__(self, engine: LiveEngine, cache: ResultCache):
+        super().__init__(engine.file_path, engine.reread_on_query, engine.match_mode)
+        self.name = engine.name
+        self.engine = engine
+        self.cache = cache
+        self.built = engine.built
+
+    def _build(self) -> None:
+        self.engine.build()
+
+    def reload(self) -> bool:
+        return self.engine.reload()
+
+    def search(self, query: str) -> bool:
+        return self.search_many([query])[0]
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        queries = list(queries)
+        generation = self.engine.current_generation()
+        results = [self.cache.get(query, generation) for query in queries]
+        missed = [query for query, result in zip(queries, results) if result is None]
+        if missed:
+            found = iter(self.engine.search_many(missed))
+            for i, result in enumerate(results):
+                if result is None:
+                    results[i] = next(found)
+                    self.cache.put(queries[i], generation, results[i])
+        return results
+
+    def prefix_search(
+        self, prefix: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        return self.engine.prefix_search(prefix, limit)
+
+    def field_search(
+        self, pattern: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        return self.engine.field_search(pattern, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.engine.stats()
+        stats.update(self.cache.stats())
+        return stats
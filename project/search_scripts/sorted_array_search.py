@@ -0,0 +1,56 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from project.search_scripts.engine import EXACT, PREFIX, SearchEngine, register_engine
+from project.search_scripts.index_file import index_path_for, load_index
+from project.search_scripts.sorted_index import SortedLineIndex
+
+
+@register_engine("sorted_array")
+class SortedArrayEngine(SearchEngine):
+    """
+    Exact line matching by binary search over a compact sorted array of the file's lines. A
+    prebuilt index next to the file (see ``build_index.py``) is memory-mapped instead of building
+    the array when it matches the file. Prefix matches are answered by the same binary search.
+    """
+
+    match_modes = (EXACT, PREFIX)
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.index: Optional[SortedLineIndex] = None
+        self.prebuilt = False
+
+    def _build(self) -> None:
+        if self.reread_on_query:
+            return
+        self.index = load_index(index_path_for(self.file_path), self.file_path)
+        self.prebuilt = self.index is not None
+        if self.index is None:
+            self.index = SortedLineIndex.from_file(self.file_path)
+
+    def current_index(self) -> SortedLineIndex:
+        if self.reread_on_query:
+            return SortedLineIndex.from_file(self.file_path)
+        return self.index
+
+    def search(self, query: str) -> bool:
+        return self.search_many([query])[0]
+
+    def search_many(self, queries: Iterable[str]) -> List[bool]:
+        index = self.current_index()
+        if self.match_mode == PREFIX:
+            return [index.has_prefix(query.encode("utf-8")) for query in queries]
+        return [query.encode("utf-8") in index for query in queries]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        if self.index is not None:
+            stats["lines"] = len(self.index)
+            stats["index_bytes"] = self.index.nbytes
+            stats["prebuilt"] = self.prebuilt
+        return stats
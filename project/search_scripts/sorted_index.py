@@ -0,0 +1,94 @@
+from array import array
+from typing import Any, Iterable, Sequence
+
+
+class SortedLineIndex:
+    """
+    Exact-match index holding every distinct line of a file in one contiguous sorted buffer.
+    Record ``i`` is ``records[offsets[i]:offsets[i + 1]]``, so the whole index costs the bytes of
+    the lines plus eight bytes per line, instead of a Python ``str`` object and a hash-table slot
+    per line; lookups are a binary search over the records.
+
+    :param records: The sorted, concatenated line bytes.
+    :param offsets: ``len + 1`` record start offsets, the last one being ``len(records)``.
+    """
+
+    def __init__(self, records: Any, offsets: Sequence[int]):
+        self.records = records
+        self.offsets = offsets
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes]) -> "SortedLineIndex":
+        """
+        Build the index from raw lines.
+
+        :param lines: The lines, stripped of surrounding whitespace.
+        :return: The index.
+        """
+        sorted_lines = sorted(set(lines))
+        offsets = array("Q", [0])
+        position = 0
+        for line in sorted_lines:
+            position += len(line)
+            offsets.append(position)
+        return cls(b"".join(sorted_lines), offsets)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "SortedLineIndex":
+        """
+        Build the index from the lines of a file.
+
+        :param file_path: The path to the file to be indexed.
+        :return: The index.
+        """
+        with open(file_path, "rb") as file:
+            return cls.from_lines(line.strip() for line in file)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def record(self, index: int) -> bytes:
+        """
+        Return one record of the index.
+
+        :param index: The position of the record in sorted order.
+        :return: The record bytes.
+        """
+        return bytes(self.records[self.offsets[index] : self.offsets[index + 1]])
+
+    def lower_bound(self, key: bytes) -> int:
+        """
+        Binary search for the first record not less than the key.
+
+        :param key: The encoded key.
+        :return: The position of that record, or ``len(self)`` if every record is smaller.
+        """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.record(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __contains__(self, key: bytes) -> bool:
+        position = self.lower_bound(key)
+        return position < len(self) and self.record(position) == key
+
+    def has_prefix(self, prefix: bytes) -> bool:
+        """
+        Check whether any record starts with the prefix.
+
+        :param prefix: The encoded prefix.
+        :return: True if some record starts with the prefix.
+        """
+        position = self.lower_bound(prefix)
+        return position < len(self) and self.record(position).startswith(prefix)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the records and the offset table.
+        """
+        return len(self.records) + len(self.offsets) * 8
@@ -0,0 +1,214 @@
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+NEWLINE = ord("\n")
+
+
+def build_suffix_array(text: Any) -> np.ndarray:
+    """
+    Sort the suffixes of a text of lines by prefix doubling, each round a vectorized NumPy sort
+    on the ranks of the first ``k`` bytes. Queries never contain a newline, so suffixes only need
+    ordering up to the end of their line: a newline ranks below every other byte, the rounds stop
+    once ``k`` covers the longest line, and suffixes starting on a newline are left out.
+
+    :param text: The lines, as bytes or a buffer such as a memory mapping.
+    :return: The start offsets of the suffixes in sorted order, as ``int32`` when the text is
+        smaller than 2 GiB and ``int64`` otherwise.
+    """
+    data = np.frombuffer(text, dtype=np.uint8)
+    size = len(data)
+    dtype = np.int32 if size < 1 << 31 else np.int64
+    if size == 0:
+        return np.empty(0, dtype=dtype)
+
+    newline = data == NEWLINE
+    breaks = np.flatnonzero(newline)
+    longest_line = int(np.diff(np.concatenate(([-1], breaks, [size]))).max())
+
+    # Dense ranks of the first byte, newline lowest
+    initial = data.astype(np.int16) + 1
+    initial[newline] = 0
+    _, rank = np.unique(initial, return_inverse=True)
+    rank = rank.astype(np.int64)
+    suffix_array = np.argsort(rank, kind="stable")
+    length = 1
+    while length < longest_line and rank[suffix_array[-1]] < size - 1:
+        # Ranks of the bytes following the first ``length``, 0 past the end of the text
+        following = np.zeros(size, dtype=np.int64)
+        following[:-length] = rank[length:] + 1
+        key = rank * (size + 1) + following
+        suffix_array = np.argsort(key, kind="stable")
+        sorted_key = key[suffix_array]
+        rank = np.empty(size, dtype=np.int64)
+        rank[suffix_array] = np.concatenate(
+            ([0], np.cumsum(sorted_key[1:] != sorted_key[:-1]))
+        )
+        length *= 2
+
+    return suffix_array[~newline[suffix_array]].astype(dtype)
+
+
+def build_lcp_array(text: Any, suffix_array: np.ndarray) -> np.ndarray:
+    """
+    Compute the longest common prefix of each suffix with the one before it in sorted order,
+    counting bytes up to the end of their line. Every round compares the next byte of all pairs
+    still matching at once.
+
+    :param text: The text the suffix array was built from.
+    :param suffix_array: The sorted suffix start offsets.
+    :return: ``lcp[i]``, the common prefix length of suffixes ``i - 1`` and ``i``; ``lcp[0]`` is 0.
+    """
+    data = np.frombuffer(text, dtype=np.uint8)
+    lcp = np.zeros(len(suffix_array), dtype=suffix_array.dtype)
+    # A trailing newline stops comparisons running off the end of the text
+    padded = np.append(data, np.uint8(NEWLINE))
+    left = suffix_array[:-1].astype(np.int64)
+    right = suffix_array[1:].astype(np.int64)
+    pairs = np.arange(len(suffix_array) - 1)
+    depth = 0
+    while pairs.size:
+        left_bytes = padded[left[pairs] + depth]
+        pairs = pairs[
+            (left_bytes == padded[right[pairs] + depth]) & (left_bytes != NEWLINE)
+        ]
+        lcp[pairs + 1] += 1
+        depth += 1
+    return lcp
+
+
+class SuffixArrayIndex:
+    """
+    Substring index over a text of lines and the sorted suffixes of that text. A query occurs in
+    a line exactly when it is a prefix of one of the suffixes, found by binary search in
+    ``O(m log n)`` for a query of length ``m``.
+
+    :param text: The lines, as bytes or a buffer such as a memory mapping.
+    :param suffix_array: The start offsets of the suffixes of ``text``, sorted by their bytes up to
+        the end of their line.
+    :param lcp: Optionally, the common prefix length of each suffix with the one before it, which
+        lets ``count`` extend a match without further binary searches.
+    """
+
+    def __init__(
+        self, text: Any, suffix_array: np.ndarray, lcp: Optional[np.ndarray] = None
+    ):
+        self.text = text
+        self.suffix_array = suffix_array
+        self.lcp = lcp
+
+    @classmethod
+    def from_text(cls, text: Any, with_lcp: bool = False) -> "SuffixArrayIndex":
+        """
+        Build the index over a text.
+
+        :param text: The lines, as bytes or a buffer such as a memory mapping.
+        :param with_lcp: Whether to compute the LCP array as well.
+        :return: The index.
+        """
+        suffix_array = build_suffix_array(text)
+        lcp = build_lcp_array(text, suffix_array) if with_lcp else None
+        return cls(text, suffix_array, lcp)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes]) -> "SuffixArrayIndex":
+        """
+        Build the index over the distinct lines given.
+
+        :param lines: The lines, stripped of surrounding whitespace.
+        :return: The index.
+        """
+        return cls.from_text(b"".join(line + b"\n" for line in sorted(set(lines))))
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "SuffixArrayIndex":
+        """
+        Build the index over the distinct lines of a file.
+
+        :param file_path: The path to the file to be indexed.
+        :return: The index.
+        """
+        with open(file_path, "rb") as file:
+            return cls.from_lines(line.strip() for line in file)
+
+    def suffix_prefix(self, index: int, length: int) -> bytes:
+        """
+        Return the first bytes of one suffix, cut at the end of its line.
+
+        :param index: The position of the suffix in sorted order.
+        :param length: The number of bytes wanted.
+        :return: At most ``length`` bytes of the suffix.
+        """
+        start = int(self.suffix_array[index])
+        prefix = self.text[start : start + length]
+        newline = prefix.find(b"\n")
+        return prefix if newline == -1 else prefix[:newline]
+
+    def lower_bound(self, key: bytes) -> int:
+        """
+        Binary search for the first suffix not less than the key.
+
+        :param key: The encoded key.
+        :return: The position of that suffix, or ``len(self)`` if every suffix is smaller.
+        """
+        length = len(key)
+        low, high = 0, len(self.suffix_array)
+        while low < high:
+            middle = (low + high) // 2
+            if self.suffix_prefix(middle, length) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def upper_bound(self, key: bytes) -> int:
+        """
+        Binary search for the first suffix that neither starts with the key nor is smaller.
+
+        :param key: The encoded key.
+        :return: The position of that suffix, or ``len(self)`` if there is none.
+        """
+        length = len(key)
+        low, high = 0, len(self.suffix_array)
+        while low < high:
+            middle = (low + high) // 2
+            if self.suffix_prefix(middle, length) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __contains__(self, key: bytes) -> bool:
+        if not key:
+            return len(self.text) > 0
+        if b"\n" in key:
+            return False
+        position = self.lower_bound(key)
+        return position < len(self) and self.suffix_prefix(position, len(key)) == key
+
+    def count(self, key: bytes) -> int:
+        """
+        Count the occurrences of a non-empty key in the text.
+
+        :param key: The encoded key.
+        :return: The number of positions the key occurs at.
+        """
+        if not key or key not in self:
+            return 0
+        first = self.lower_bound(key)
+        if self.lcp is not None:
+            # The matches are the run of suffixes sharing at least len(key) bytes with the first
+            shorter = np.flatnonzero(self.lcp[first + 1 :] < len(key))
+            return int(shorter[0]) + 1 if shorter.size else len(self) - first
+        return self.upper_bound(key) - first
+
+    def __len__(self) -> int:
+        return len(self.suffix_array)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the text, the suffix array and the LCP array.
+        """
+        lcp_bytes = 0 if self.lcp is None else self.lcp.nbytes
+        return len(self.text) + self.suffix_array.nbytes + lcp_bytes
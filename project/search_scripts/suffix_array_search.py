@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+from config.settings import get_settings
+from project.search_scripts.engine import SearchEngine, register_engine
+from project.search_scripts.index_file import load_suffix_array, suffix_array_path_for
+from project.search_scripts.mmap_search import read_file, search_string_in_file
+from project.search_scripts.suffix_array import SuffixArrayIndex
+
+settings = get_settings()
+
+
+@register_engine("suffix_array")
+class SuffixArrayEngine(SearchEngine):
+    """
+    Substring search by binary search over a suffix array of the file's bytes. A suffix array
+    saved next to the file (see ``build_index.py --suffix-array``) is memory-mapped instead of
+    sorting the suffixes when it matches the file; the file's own bytes are held as a copy, which
+    stays valid if the file is rewritten. When the file is re-read on each query the
+    mapped file is scanned instead, as sorting its suffixes costs far more than one scan.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.index: Optional[SuffixArrayIndex] = None
+        self.prebuilt = False
+
+    def _build(self) -> None:
+        if self.reread_on_query:
+            return
+        self.index = load_suffix_array(
+            suffix_array_path_for(self.file_path), self.file_path
+        )
+        self.prebuilt = self.index is not None
+        if self.index is None:
+            self.index = SuffixArrayIndex.from_text(
+                read_file(self.file_path) or b"", settings.suffix_array_lcp
+            )
+
+    def search(self, query: str) -> bool:
+        if self.reread_on_query:
+            return search_string_in_file(self.file_path, query)
+        return query.encode("utf-8") in self.index
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        if self.index is not None:
+            stats["suffixes"] = len(self.index)
+            stats["index_bytes"] = self.index.nbytes
+            stats["lcp"] = self.index.lcp is not None
+            stats["prebuilt"] = self.prebuilt
+        return stats
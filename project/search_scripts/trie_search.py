@@ -1,45 +1,21 @@
 from functools import lru_cache
+from heapq import merge
+from itertools import islice
 from time import perf_counter
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from project.search_scripts.compact_trie import CompactTrie
+from project.search_scripts.engine import EXACT, PREFIX, SearchEngine, register_engine
+from project.search_scripts.file_watch import iter_lines_from
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-class TrieNode:
-    def __init__(self):
-        self.children = {}
-        self.is_end_of_word = False
-
-
-class Trie:
-    def __init__(self):
-        self.root = TrieNode()
-
-    def insert(self, word: str):
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
-        node.is_end_of_word = True
-
-    def search(self, word: str) -> bool:
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                return False
-            node = node.children[char]
-        return node.is_end_of_word
-
-
 @lru_cache(maxsize=1)
-def build_trie_from_file(file_path: str) -> Trie:
-    trie = Trie()
+def build_trie_from_file(file_path: str) -> Optional[CompactTrie]:
     try:
-        with open(file_path, "r") as file:
-            for line in file:
-                trie.insert(line.strip())
+        trie = CompactTrie.from_file(file_path)
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         return None
@@ -54,8 +30,8 @@ def build_trie_from_file(file_path: str) -> Trie:
 
 def search_string_in_file(file_path: str, search_string: str) -> bool:
     """
-    Search for a specific string in a file using a TRIE. The function builds a Trie from the file lines
-    and then searches the Trie for the search string.
+    Search for a specific string in a file using a TRIE. The function builds a compact trie from
+    the file lines and then searches the trie for the search string.
 
     :param file_path: The path to the file to be searched.
     :param search_string: The string to search for within the file.
@@ -68,7 +44,7 @@ def search_string_in_file(file_path: str, search_string: str) -> bool:
         return False
 
     try:
-        result = trie.search(search_string)
+        result = search_string.encode("utf-8") in trie
     except Exception as e:
         logger.error(f"Unexpected error during search: {e}")
         return False
@@ -80,3 +56,78 @@ def search_string_in_file(file_path: str, search_string: str) -> bool:
         )
 
     return result
+
+
+@register_engine("trie")
+class TrieEngine(SearchEngine):
+    """
+    Exact or prefix line matching against a compact trie built from the file. Lines appended
+    while the file is watched are kept in a set beside the trie until the next rebuild, as the trie
+    is immutable.
+    """
+
+    match_modes = (EXACT, PREFIX)
+
+    def __init__(
+        self,
+        file_path: str,
+        reread_on_query: bool = False,
+        match_mode: Optional[str] = None,
+    ):
+        super().__init__(file_path, reread_on_query, match_mode)
+        self.trie: Optional[CompactTrie] = None
+        self.appended: Set[str] = set()
+
+    def _build(self) -> None:
+        if not self.reread_on_query:
+            # Build a trie owned by this engine rather than the shared cached one, so rebuilds
+            # are not affected by the cache
+            self.trie = build_trie_from_file.__wrapped__(self.file_path)
+
+    def append_from(self, offset: int) -> bool:
+        if self.trie is None:
+            return False
+        self.appended.update(iter_lines_from(self.file_path, offset))
+        return True
+
+    def search(self, query: str) -> bool:
+        if self.reread_on_query:
+            # Bypass the lru_cache so changes to the file are picked up
+            trie = build_trie_from_file.__wrapped__(self.file_path)
+        else:
+            trie = self.trie
+        if trie is None:
+            return False
+        if self.match_mode == PREFIX:
+            return trie.has_prefix(query.encode("utf-8")) or any(
+                line.startswith(query) for line in self.appended
+            )
+        return query.encode("utf-8") in trie or query in self.appended
+
+    def prefix_search(
+        self, prefix: str, limit: int = 0
+    ) -> Optional[Tuple[int, List[str]]]:
+        trie = (
+            build_trie_from_file.__wrapped__(self.file_path)
+            if self.reread_on_query
+            else self.trie
+        )
+        if trie is None:
+            return 0, []
+        encoded = prefix.encode("utf-8")
+        appended = sorted(
+            line.encode("utf-8")
+            for line in self.appended
+            if line.startswith(prefix) and line.encode("utf-8") not in trie
+        )
+        count = trie.count_prefix(encoded) + len(appended)
+        lines = islice(merge(trie.iter_prefix(encoded), appended), limit)
+        return count, [line.decode("utf-8", errors="ignore") for line in lines]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        if self.trie is not None:
+            stats["trie_nodes"] = len(self.trie)
+            stats["index_bytes"] = self.trie.nbytes
+            stats["appended_lines"] = len(self.appended)
+        return stats
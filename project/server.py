@@ -1,12 +1,21 @@
+import queue
+import selectors
+import signal
 import socket
 import ssl
-import threading
-from time import perf_counter
-from typing import Optional
+from time import monotonic, perf_counter
+from typing import List, Optional, Tuple
 
 from config.settings import get_settings
-from project.search_scripts.hash_set_search import initialize_searcher, search_string_in_file_hash_set
-from project.search_scripts.linear_search import read_file_contents, search_string_in_file
+from project.protocol import (
+    QUERY_TERMINATOR,
+    ProtocolSession,
+    RequestBuffer,
+    decode_query,
+)
+from project.search_scripts.engine import SearchEngine
+from project.search_scripts.registry import create_engine
+from utils.dispatcher import BoundedDispatcher
 from utils.logger import get_logger
 
 settings = get_settings()
@@ -20,69 +29,347 @@ logger = get_logger(__name__)
 # )
 
 
+def create_ssl_context() -> ssl.SSLContext:
+    """
+    Create the server-side TLS context from the configured certificate and key.
+
+    :return: The SSL context.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(
+        certfile=settings.certfile_path,
+        keyfile=settings.keyfile_path,
+        password=settings.ssl_key,
+    )
+    return context
+
+
+def install_reload_signal(engine: SearchEngine) -> None:
+    """
+    Rebuild the index in the background when the process receives SIGHUP.
+
+    :param engine: The search engine to reload.
+    :return: None
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return
+    signal.signal(signal.SIGHUP, lambda signum, frame: engine.reload())
+    logger.info("Send SIGHUP to reload the index")
+
+
+def read_first_request(
+    client_socket: socket.socket, max_payload_size: int, first_line_timeout: float
+) -> Tuple[bytes, bool]:
+    """
+    Read the start of a connection until it shows which protocol the client speaks. A first line
+    may span several reads, so the client is only taken for a legacy one once no newline has
+    arrived within ``first_line_timeout`` of the last read, it closes its side, or it sends
+    ``max_payload_size`` bytes without one.
+
+    :param client_socket: The socket object for the client connection.
+    :param max_payload_size: Maximum number of bytes allowed in a single query.
+    :param first_line_timeout: Seconds to wait for each further packet of the first line.
+    :return: The bytes read, and whether the client sends newline-terminated queries.
+    """
+    data = client_socket.recv(max_payload_size)
+    if not data or QUERY_TERMINATOR in data:
+        return data, True
+    idle_timeout = client_socket.gettimeout()
+    client_socket.settimeout(first_line_timeout)
+    try:
+        while QUERY_TERMINATOR not in data and len(data) < max_payload_size:
+            chunk = client_socket.recv(max_payload_size - len(data))
+            if not chunk:
+                return data, False
+            data += chunk
+    except socket.timeout:
+        return data, False
+    finally:
+        client_socket.settimeout(idle_timeout)
+    return data, QUERY_TERMINATOR in data
+
+
+class ClientConnection:
+    """
+    Protocol state of one client connection, served one readable event at a time, so between
+    requests a persistent connection needs no thread of its own.
+
+    Clients may keep the connection open and send many newline-terminated queries, pipelining
+    them without waiting for answers; responses come back one line per query in order. A first
+    request that ends without a terminator (see ``read_first_request``) is treated as a single
+    legacy query and the connection is closed once it is answered.
+
+    :param client_socket: The socket object for the client connection.
+    :param client_address: The address of the client.
+    :param engine: The search engine used to answer the queries.
+    """
+
+    def __init__(
+        self, client_socket: socket.socket, client_address: str, engine: SearchEngine
+    ):
+        self.socket = client_socket
+        self.address = client_address
+        self.buffer = RequestBuffer(settings.max_payload_size)
+        self.session = ProtocolSession(
+            engine, settings.max_batch_size, settings.allow_admin_commands
+        )
+        self.handled = 0
+        # Whether the client sends newline-terminated queries, unknown until its first request
+        self.keep_alive: Optional[bool] = None
+        # TLS sockets are accepted without their handshake, which runs once the client sends
+        self.handshake_pending = isinstance(client_socket, ssl.SSLSocket)
+        self.last_active = monotonic()
+        client_socket.settimeout(settings.connection_idle_timeout)
+
+    @property
+    def expires_at(self) -> float:
+        """
+        When the connection is closed if the client sends nothing more.
+        """
+        if self.handshake_pending:
+            return self.last_active + settings.ssl_handshake_timeout
+        return self.last_active + settings.connection_idle_timeout
+
+    def handshake(self) -> None:
+        self.socket.settimeout(settings.ssl_handshake_timeout)
+        self.socket.do_handshake()
+        self.socket.settimeout(settings.connection_idle_timeout)
+        self.handshake_pending = False
+        self.last_active = monotonic()
+
+    def answer(self, requests: List[str]) -> None:
+        request_start_time = perf_counter()
+        response = self.session.handle_lines(requests)
+        if response:
+            self.socket.sendall(response)
+        self.handled += len(requests)
+        logger.debug(
+            f"Answered {len(requests)} request(s) in "
+            f"{(perf_counter() - request_start_time) * 1e3:.3f} milliseconds"
+        )
+
+    def read_and_answer(self) -> bool:
+        if self.handshake_pending:
+            self.handshake()
+            return True
+        if self.keep_alive is None:
+            data, self.keep_alive = read_first_request(
+                self.socket, settings.max_payload_size, settings.first_line_timeout
+            )
+        else:
+            data = self.socket.recv(settings.max_payload_size)
+        if not data:
+            # The client closed its side; answer a final unterminated query
+            if self.keep_alive:
+                self.answer(self.buffer.flush())
+            return False
+        self.answer(self.buffer.feed(data) if self.keep_alive else [decode_query(data)])
+        self.last_active = monotonic()
+        return self.keep_alive
+
+    def serve(self) -> bool:
+        """
+        Read what the client has sent and answer every complete request in it; the read blocks
+        until data arrives or ``connection_idle_timeout`` passes.
+
+        :return: True if the connection stays open for more requests.
+        """
+        try:
+            return self.read_and_answer()
+        except socket.timeout:
+            if self.handshake_pending:
+                logger.warning(f"TLS handshake with {self.address} timed out")
+            else:
+                logger.info(
+                    f"Connection from {self.address} idle for "
+                    f"{settings.connection_idle_timeout}s after {self.handled} request(s)"
+                )
+        except ValueError as e:
+            logger.warning(f"Invalid request from {self.address}: {e}")
+        except OSError as e:
+            logger.error(f"OS error handling client connection: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error during client connection handling: {e}")
+        return False
+
+    def has_pending_data(self) -> bool:
+        """
+        Whether TLS has already decrypted data that a selector would not report as readable.
+        """
+        return isinstance(self.socket, ssl.SSLSocket) and self.socket.pending() > 0
+
+    def close(self) -> None:
+        logger.debug(f"Handled {self.handled} request(s) from {self.address[0]}")
+        self.socket.close()
+        logger.info(f"Closed client connection from {self.address}")
+
+
 def handle_client_connection(
     client_socket: socket.socket,
     client_address: str,
-    file_path: str,
-    reread_on_query: bool,
-    file_contents: Optional[str] = None,
+    engine: SearchEngine,
 ) -> None:
-    client_ip = client_address[0]
+    """
+    Handle an incoming client connection on the calling thread until it is closed, read requests,
+    search for each request string with the configured engine, and send back a response
+    indicating whether the string exists in the file.
 
+    :param client_socket: The socket object for the client connection.
+    :param client_address: The address of the client.
+    :param engine: The search engine used to answer the queries.
+    :return: None
+    """
+    connection = ClientConnection(client_socket, client_address, engine)
     try:
-        # if not rate_limiter.is_allowed(client_ip):
-        #     response = "Too many requests, please try again later.\n"
-        #     client_socket.send(response.encode("utf-8"))
-        #     logger.warning(f"Rate limit exceeded for {client_address}")
-        #     return
+        while connection.serve():
+            pass
+    finally:
+        connection.close()
 
-        request_start_time = perf_counter()
-        request = (
-            client_socket.recv(settings.max_payload_size)
-            .decode("utf-8", errors="ignore")
-            .rstrip("\x00")
-            .strip()
-        )
-        request_end_time = perf_counter()
-        logger.debug(
-            f"Time to receive and decode request: {(request_end_time - request_start_time) * 1e3:.3f} milliseconds"
-        )
 
-        search_start_time = perf_counter()
+class ConnectionPoller:
+    """
+    Accepts connections and keeps every connection that is waiting for its client's next request
+    in a selector, handing it to a worker thread only once the client has sent something. A
+    worker is therefore held for one read and its answers, not for the life of a persistent
+    connection, and idle clients never starve the pool. Connections idle for longer than
+    ``connection_idle_timeout`` are closed.
 
-        if reread_on_query:
-            exists = search_string_in_file(file_path, request)
+    With TLS, accepted sockets are wrapped without their handshake, which runs on a worker once
+    the client's hello arrives, so a client that connects and stays silent never blocks the
+    selector; one that has not completed its handshake within ``ssl_handshake_timeout`` is closed.
+
+    :param server_socket: The plain listening socket.
+    :param engine: The search engine used to answer the queries.
+    :param dispatcher: The bounded pool the requests are served on.
+    :param ssl_context: The server-side TLS context, or None to serve plain TCP.
+    """
+
+    def __init__(
+        self,
+        server_socket: socket.socket,
+        engine: SearchEngine,
+        dispatcher: BoundedDispatcher,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        self.server_socket = server_socket
+        self.ssl_context = ssl_context
+        self.engine = engine
+        self.dispatcher = dispatcher
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(server_socket, selectors.EVENT_READ)
+        # Workers hand connections back through a queue and wake the selector with a byte
+        self.returned: "queue.SimpleQueue[ClientConnection]" = queue.SimpleQueue()
+        self.wakeup_receiver, self.wakeup_sender = socket.socketpair()
+        self.wakeup_receiver.setblocking(False)
+        self.selector.register(self.wakeup_receiver, selectors.EVENT_READ)
+        self.running = True
+
+    def park(self, connection: ClientConnection) -> None:
+        self.selector.register(connection.socket, selectors.EVENT_READ, connection)
+
+    def hand_back(self, connection: ClientConnection) -> None:
+        self.returned.put(connection)
+        self.wakeup_sender.send(b"\0")
+
+    def serve(self, connection: ClientConnection) -> None:
+        """
+        Serve one readable connection on a worker thread, then return it to the selector.
+        """
+        keep_open = connection.serve()
+        while keep_open and connection.has_pending_data():
+            keep_open = connection.serve()
+        if keep_open and self.running:
+            self.hand_back(connection)
         else:
-            exists = search_string_in_file_hash_set(request, reread_on_query)
+            connection.close()
 
-        search_end_time = perf_counter()
-        logger.debug(
-            f"Total search time: {(search_end_time - search_start_time) * 1e3:.3f} milliseconds"
-        )
+    def dispatch(self, connection: ClientConnection) -> None:
+        if not self.dispatcher.submit(self.serve, connection):
+            reject_client_connection(connection.socket, connection.address)
 
-        response_start_time = perf_counter()
-        response = "STRING EXISTS\n" if exists else "STRING NOT FOUND\n"
-        client_socket.send(response.encode("utf-8"))
-        response_end_time = perf_counter()
-        logger.debug(
-            f"Time to prepare and send response: {(response_end_time - response_start_time) * 1e3:.3f} milliseconds"
-        )
+    def accept(self) -> None:
+        try:
+            client_sock, client_address = self.server_socket.accept()
+        except (socket.timeout, OSError) as e:
+            logger.error(f"Socket error accepting client connection: {e}")
+            return
+        logger.info(f"Accepted connection from {client_address}")
+        if self.ssl_context is not None:
+            try:
+                client_sock = self.ssl_context.wrap_socket(
+                    client_sock, server_side=True, do_handshake_on_connect=False
+                )
+            except OSError as e:
+                logger.error(f"Socket error wrapping client connection in TLS: {e}")
+                client_sock.close()
+                return
+        self.park(ClientConnection(client_sock, client_address, self.engine))
+
+    def close_idle(self) -> None:
+        now = monotonic()
+        idle = [
+            key.data
+            for key in self.selector.get_map().values()
+            if key.data is not None and key.data.expires_at < now
+        ]
+        for connection in idle:
+            self.selector.unregister(connection.socket)
+            if connection.handshake_pending:
+                logger.warning(f"TLS handshake with {connection.address} timed out")
+            else:
+                logger.info(
+                    f"Connection from {connection.address} idle for "
+                    f"{settings.connection_idle_timeout}s after {connection.handled} request(s)"
+                )
+            connection.close()
+
+    def run(self) -> None:
+        """
+        Accept and dispatch connections until ``stop`` is called.
+        """
+        while self.running:
+            for key, _ in self.selector.select(timeout=1.0):
+                if key.fileobj is self.server_socket:
+                    self.accept()
+                elif key.fileobj is self.wakeup_receiver:
+                    try:
+                        self.wakeup_receiver.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    while not self.returned.empty():
+                        self.park(self.returned.get())
+                else:
+                    self.selector.unregister(key.fileobj)
+                    self.dispatch(key.data)
+            self.close_idle()
+        for key in list(self.selector.get_map().values()):
+            if key.data is not None:
+                key.data.close()
+        self.selector.close()
+        self.wakeup_receiver.close()
+        self.wakeup_sender.close()
 
-        total_end_time = perf_counter()
-        execution_time = (
-            total_end_time - request_start_time
-        ) * 1e3  # Convert to milliseconds for higher precision
-        logger.debug(f"Execution time: {execution_time:.3f} milliseconds")
-        logger.debug(f"Request handled successfully from {client_ip}")
-    except socket.timeout as e:
-        logger.error(f"Connection timed out: {e}")
+    def stop(self) -> None:
+        self.running = False
+        self.wakeup_sender.send(b"\0")
+
+
+def reject_client_connection(client_socket: socket.socket, client_address: str) -> None:
+    """
+    Tell a client the server is overloaded and close its connection without searching.
+
+    :param client_socket: The socket object for the client connection.
+    :param client_address: The address of the client.
+    :return: None
+    """
+    try:
+        client_socket.send(b"SERVER BUSY\n")
     except OSError as e:
-        logger.error(f"OS error handling client connection: {e}")
-    except Exception as e:
-        logger.error(f"Unexpected error during client connection handling: {e}")
+        logger.error(f"OS error rejecting client connection: {e}")
     finally:
         client_socket.close()
-        logger.info(f"Closed client connection from {client_address}")
+        logger.warning(f"Rejected client connection from {client_address}: server busy")
 
 
 def start_server(
@@ -91,6 +378,13 @@ def start_server(
     file_path: str,
     server_backlog: int,
     reread_on_query: bool,
+    search_algorithm: str = settings.search_algorithm,
+    match_mode: str = settings.match_mode,
+    watch_file: bool = settings.watch_file,
+    bloom_filter: bool = settings.bloom_filter,
+    worker_pool_size: int = settings.worker_pool_size,
+    worker_queue_size: int = settings.worker_queue_size,
+    reuse_port: bool = False,
 ) -> None:
     """
     Start a server.
@@ -100,25 +394,29 @@ def start_server(
     :param file_path: The path to the configuration file.
     :param server_backlog: The maximum backlog of connections.
     :param reread_on_query: Boolean indicating whether to re-read the file on each query.
+    :param search_algorithm: Name of the registered search engine to use, or ``auto``.
+    :param match_mode: Whether a line must equal, start with or contain the query.
+    :param watch_file: Boolean indicating whether to keep a cached index refreshed on file changes.
+    :param bloom_filter: Boolean indicating whether to answer definite misses from a Bloom filter.
+    :param worker_pool_size: Number of threads answering client requests.
+    :param worker_queue_size: Number of ready connections allowed to wait for a free thread.
+    :param reuse_port: Whether to bind with SO_REUSEPORT so several processes share the port.
     :return: None
     """
 
     try:
         server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if reuse_port:
+            # Let the kernel balance connections between processes bound to the same port
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         server.bind((bind_address, port))
         server.listen(server_backlog)
         logger.info(
             f"Server listening on {bind_address}:{port} with backlog {server_backlog} and file_path {file_path}"
         )
 
-        if settings.ssl_enabled:
-            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-            context.load_cert_chain(
-                certfile=settings.certfile_path,
-                keyfile=settings.keyfile_path,
-                password=settings.ssl_key,
-            )
-            server = context.wrap_socket(server, server_side=True)
+        # Connections are wrapped in TLS as they are accepted, see ConnectionPoller
+        ssl_context = create_ssl_context() if settings.ssl_enabled else None
 
     except (socket.timeout, OSError) as e:
         logger.error(f"Socket error during server setup: {e}")
@@ -129,35 +427,30 @@ def start_server(
 
     # TODO CATCH SSL ERRORS AND NOT SOCKET ERRORS
 
-    initialize_searcher(file_path, reread_on_query)
+    try:
+        engine = create_engine(
+            search_algorithm,
+            file_path,
+            reread_on_query,
+            watch_file,
+            settings.bloom_false_positive_rate if bloom_filter else None,
+            match_mode,
+            settings.result_cache_size,
+            settings.result_cache_ttl,
+        )
+    except ValueError as e:
+        logger.error(f"Invalid search engine configuration: {e}")
+        server.close()
+        return
 
-    # Read file contents if not rereading on each query
-    file_contents = None
-    if not reread_on_query:
-        file_contents = read_file_contents(file_path)
+    install_reload_signal(engine)
+    dispatcher = BoundedDispatcher(worker_pool_size, worker_queue_size)
 
     try:
-        while True:
-            try:
-                client_sock, client_address = server.accept()
-                logger.info(f"Accepted connection from {client_address}")
-                client_handler = threading.Thread(
-                    target=handle_client_connection,
-                    args=(
-                        client_sock,
-                        client_address,
-                        file_path,
-                        reread_on_query,
-                        file_contents,
-                    ),
-                )
-                client_handler.start()
-            except (socket.timeout, OSError) as e:
-                logger.error(f"Socket error accepting client connection: {e}")
-            except Exception as e:
-                logger.error(f"Unexpected error during client handling: {e}")
+        ConnectionPoller(server, engine, dispatcher, ssl_context).run()
     except Exception as e:
         logger.error(f"Unexpected error in the server loop: {e}")
     finally:
         server.close()
+        dispatcher.shutdown(wait=False)
         logger.info("Server closed")
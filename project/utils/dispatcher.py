@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BoundedDispatcher:
+    """
+    Runs tasks on a fixed-size thread pool and refuses work once the pool and its queue are full,
+    so an overloaded server sheds connections instead of growing without bound.
+
+    :param max_workers: Number of worker threads.
+    :param queue_size: Number of tasks allowed to wait for a free worker.
+    """
+
+    def __init__(self, max_workers: int, queue_size: int):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if queue_size < 0:
+            raise ValueError("queue_size must not be negative")
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="search-worker"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """
+        Submit a task if there is capacity for it.
+
+        :param fn: The callable to run on a worker thread.
+        :param args: Positional arguments for the callable.
+        :return: True if the task was accepted, False if the dispatcher is saturated.
+        """
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            logger.warning(
+                f"Worker pool saturated ({self.max_workers} workers, {self.queue_size} queued), "
+                f"rejected {self.rejected} task(s) so far"
+            )
+            return False
+
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        return True
+
+    def _release(self, future: Future) -> None:
+        self._slots.release()
+        if future.exception() is not None:
+            logger.error(f"Unhandled error in worker task: {future.exception()}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting tasks and release the worker threads.
+
+        :param wait: Whether to wait for running and queued tasks to finish.
+        """
+        self.executor.shutdown(wait=wait)
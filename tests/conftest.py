@@ -4,10 +4,14 @@ import socket
 import ssl
 import string
 import subprocess
+import sys
 import time
 
 import pytest
 
+# Mirror ``python project/main.py``, which puts the project directory on the import path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "project"))
+
 from project.config.settings import get_settings
 from project.utils.logger import get_logger
 
@@ -98,6 +102,22 @@ def prepare_test_files():
     return test_files
 
 
+@pytest.fixture(scope="function")
+def sample_file(tmp_path):
+    """
+    Fixture writing a small data file in the server's semicolon-separated format.
+    """
+    lines = [
+        "13;0;23;11;0;16;5;0;",
+        "7;21;3;0;18;2;9;0;",
+        "13;0;23;11;0;16;5;1;",
+        "1;2;3;4;5;6;7;8;",
+    ]
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("\n".join(lines) + "\n")
+    return str(file_path)
+
+
 @pytest.fixture(scope="function")
 def query_server():
     """
@@ -118,9 +138,11 @@ def query_server():
         try:
             port = int(os.getenv("port"))
             client_socket.connect((settings.ip_address, port))
-            client_socket.sendall(query.encode("utf-8"))
-            response = client_socket.recv(1024).decode("utf-8")
-            return response
+            # A terminated query is answered as soon as it arrives, without the server waiting
+            # to tell it from a legacy query split across packets
+            client_socket.sendall(f"{query}\n".encode("utf-8"))
+            with client_socket.makefile("rb") as reader:
+                return reader.readline().decode("utf-8")
         except Exception as e:
             logger.error(f"Failed to connect: {e}")
             return None
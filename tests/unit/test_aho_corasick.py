@@ -0,0 +1,54 @@
+import random
+
+from project.search_scripts import aho_corasick_search
+from project.search_scripts.aho_corasick_search import (
+    AhoCorasickAutomaton,
+    search_strings_in_file,
+)
+from project.search_scripts.registry import create_engine
+
+
+def test_automaton_matches_every_pattern_like_a_scan():
+    random.seed(7)
+    lines = [
+        ";".join(str(random.randint(0, 9)) for _ in range(6)) + ";" for _ in range(50)
+    ]
+    text = "\n".join(lines).encode()
+    patterns = sorted(
+        {
+            line[i : i + n].encode()
+            for line in lines[:10]
+            for i in range(3)
+            for n in (2, 5)
+        }
+    )
+    patterns += [b"9;9;9;9;", b"0;\n1;", b"x"]
+
+    found = AhoCorasickAutomaton(patterns).scan([text[:37], text[37:]])
+
+    assert found == [
+        b"\n" not in pattern and any(pattern in line.encode() for line in lines)
+        for pattern in patterns
+    ]
+
+
+def test_batch_search_keeps_query_order(sample_file):
+    queries = ["0;0;", "23;11;", "", "1;2;3;4;5;6;7;8;", "23;11;"]
+
+    assert search_strings_in_file(sample_file, queries) == [
+        False,
+        True,
+        True,
+        True,
+        True,
+    ]
+
+
+def test_small_batches_skip_the_automaton(sample_file, monkeypatch):
+    def fail(*args):
+        raise AssertionError("automaton built for a small batch")
+
+    monkeypatch.setattr(aho_corasick_search, "search_strings_in_file", fail)
+    engine = create_engine("aho_corasick", sample_file, reread_on_query=True)
+
+    assert engine.search_many(["0;0;", "23;11;"]) == [False, True]
@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import get_settings
+from project.async_server import handle_client
+from project.search_scripts.registry import create_engine
+
+
+async def _exchange(file_path, payload, close_write=False, pause_after=None):
+    engine = create_engine("hash_set", file_path, reread_on_query=False)
+    executor = ThreadPoolExecutor(max_workers=2)
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_client(reader, writer, engine, executor),
+        host="127.0.0.1",
+        port=0,
+    )
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        if pause_after is not None:
+            # The first line arrives in two reads
+            writer.write(payload[:pause_after])
+            await writer.drain()
+            await asyncio.sleep(0.02)
+            payload = payload[pause_after:]
+        writer.write(payload)
+        await writer.drain()
+        if close_write:
+            writer.write_eof()
+        response = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        return response
+    finally:
+        server.close()
+        await server.wait_closed()
+        executor.shutdown()
+
+
+def test_async_server_answers_pipelined_queries(sample_file):
+    payload = b"13;0;23;11;0;16;5;0;\n0;0;\n1;2;3;4;5;6;7;8;\n"
+
+    response = asyncio.run(_exchange(sample_file, payload, close_write=True))
+
+    assert response == b"STRING EXISTS\nSTRING NOT FOUND\nSTRING EXISTS\n"
+
+
+def test_async_server_answers_legacy_single_query(sample_file):
+    response = asyncio.run(_exchange(sample_file, b"7;21;3;0;18;2;9;0;"))
+
+    assert response == b"STRING EXISTS\n"
+
+
+def test_async_server_waits_for_a_first_line_split_across_reads(
+    sample_file, monkeypatch
+):
+    # Longer than the pause between the two reads
+    monkeypatch.setattr(get_settings(), "first_line_timeout", 1.0)
+    payload = b"13;0;23;11;0;16;5;0;\n0;0;\n"
+
+    response = asyncio.run(
+        _exchange(sample_file, payload, close_write=True, pause_after=8)
+    )
+
+    assert response == b"STRING EXISTS\nSTRING NOT FOUND\n"
+
+
+def test_async_server_closes_idle_connections(sample_file, monkeypatch):
+    monkeypatch.setattr(get_settings(), "connection_idle_timeout", 0.1)
+
+    async def exchange():
+        engine = create_engine("hash_set", sample_file, reread_on_query=False)
+        executor = ThreadPoolExecutor(max_workers=1)
+        server = await asyncio.start_server(
+            lambda reader, writer: handle_client(reader, writer, engine, executor),
+            host="127.0.0.1",
+            port=0,
+        )
+        port = server.sockets[0].getsockname()[1]
+        try:
+            # One client goes quiet after a query, the other never sends one
+            answered = await asyncio.open_connection("127.0.0.1", port)
+            silent = await asyncio.open_connection("127.0.0.1", port)
+            answered[1].write(b"1;2;3;4;5;6;7;8;\n")
+            responses = [
+                await asyncio.wait_for(reader.read(), timeout=5)
+                for reader, _ in (answered, silent)
+            ]
+            for _, writer in (answered, silent):
+                writer.close()
+            return responses
+        finally:
+            server.close()
+            await server.wait_closed()
+            executor.shutdown()
+
+    assert asyncio.run(exchange()) == [b"STRING EXISTS\n", b""]
@@ -0,0 +1,87 @@
+import pytest
+
+from project.search_scripts.bloom_filter import BloomFilter, count_lines
+from project.search_scripts.registry import create_engine
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+    items = [f"{i};{i * 7 % 29};".encode() for i in range(1000)]
+    for item in items:
+        bloom_filter.add(item)
+
+    assert all(item in bloom_filter for item in items)
+    false_positives = sum(f"x{i};".encode() in bloom_filter for i in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=10, false_positive_rate=1.5)
+
+
+def test_count_lines_handles_missing_final_newline(tmp_path):
+    file_path = tmp_path / "data.txt"
+    file_path.write_bytes(b"1;\n2;\n3;")
+
+    assert count_lines(str(file_path)) == 3
+
+
+def test_filtered_engine_answers_misses_from_the_filter(sample_file):
+    engine = create_engine(
+        "sorted_array",
+        sample_file,
+        reread_on_query=False,
+        bloom_false_positive_rate=0.001,
+    )
+
+    assert engine.search("13;0;23;11;0;16;5;0;")
+    assert engine.search_many(["0;", "1;2;3;4;5;6;7;8;"]) == [False, True]
+    assert engine.stats()["bloom_rejected"] >= 1
+
+
+def test_bloom_filter_is_skipped_for_substring_engines(sample_file):
+    engine = create_engine(
+        "linear", sample_file, reread_on_query=True, bloom_false_positive_rate=0.01
+    )
+
+    assert engine.search("23;11;")
+    assert "bloom_rejected" not in engine.stats()
+
+
+@pytest.mark.parametrize("name", ["hash_set", "trie"])
+def test_bloom_filter_is_skipped_where_lookups_are_cheaper(sample_file, name):
+    engine = create_engine(
+        name, sample_file, reread_on_query=False, bloom_false_positive_rate=0.01
+    )
+
+    assert engine.search("23;11;0;16;5;0;") is False
+    assert "bloom_rejected" not in engine.stats()
+
+
+def test_packed_record_batches_bypass_the_filter(sample_file):
+    engine = create_engine(
+        "packed_records",
+        sample_file,
+        reread_on_query=False,
+        bloom_false_positive_rate=0.001,
+    )
+
+    assert engine.search_many(["0;", "1;2;3;4;5;6;7;8;"]) == [False, True]
+    assert engine.stats()["bloom_rejected"] == 0
+    assert engine.search("0;") is False
+    assert engine.stats()["bloom_rejected"] == 1
+
+
+def test_filtered_engine_ingests_appended_lines(sample_file):
+    engine = create_engine(
+        "packed_records",
+        sample_file,
+        reread_on_query=False,
+        watch_file=True,
+        bloom_false_positive_rate=0.001,
+    )
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+
+    assert engine.search("2;2;2;")
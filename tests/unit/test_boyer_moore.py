@@ -0,0 +1,24 @@
+import random
+
+import pytest
+
+from project.search_scripts.boyer_moore_search import BoyerMoorePattern, HorspoolPattern
+from project.search_scripts.registry import create_engine
+
+
+@pytest.mark.parametrize("pattern_class", [BoyerMoorePattern, HorspoolPattern])
+def test_compiled_patterns_find_the_first_occurrence(pattern_class):
+    random.seed(11)
+    text = bytes(random.choice(b"aab;\xc3") for _ in range(2000))
+    for _ in range(200):
+        pattern = bytes(random.choice(b"aab;\xc3") for _ in range(random.randint(1, 9)))
+        assert pattern_class(pattern).find(text) == text.find(pattern), pattern
+
+
+@pytest.mark.parametrize("name", ["boyer_moore", "horspool"])
+def test_engines_search_bytes_beyond_latin_1(tmp_path, name):
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("1;2;\n€;3;\n", encoding="utf-8")
+    engine = create_engine(name, str(file_path), reread_on_query=True)
+
+    assert engine.search_many(["€;3;", "€;4;", "2;\n€"]) == [True, False, False]
@@ -0,0 +1,43 @@
+from project.search_scripts.compact_trie import CompactTrie
+
+
+def test_compact_trie_membership_and_prefixes():
+    lines = [b"13;0;23;", b"13;0;2;", b"7;21;3;", b"13;"]
+    trie = CompactTrie.from_lines(lines)
+
+    for line in lines:
+        assert line in trie
+    assert b"13;0;" not in trie
+    assert b"13;0;23;1" not in trie
+    assert trie.has_prefix(b"13;0;2")
+    assert trie.has_prefix(b"")
+    assert not trie.has_prefix(b"8")
+
+
+def test_compact_trie_shares_suffixes():
+    lines = [f"{i};0;0;0;0;".encode() for i in range(10)]
+    trie = CompactTrie.from_lines(lines)
+
+    # The ten lines share one chain of nodes after their first byte
+    assert len(trie) == len(b";0;0;0;0;") + 2
+    assert all(line in trie for line in lines)
+
+
+def test_compact_trie_empty():
+    trie = CompactTrie.from_lines([])
+
+    assert b"" not in trie
+    assert not trie.has_prefix(b"")
+
+
+def test_compact_trie_counts_and_lists_prefix_matches():
+    lines = [b"13;0;23;", b"13;0;2;", b"7;21;3;", b"13;", b"13;1;"]
+    trie = CompactTrie.from_lines(lines + [b"13;"])
+
+    assert trie.count_prefix(b"13;") == 4
+    assert trie.count_prefix(b"13;0;") == 2
+    assert trie.count_prefix(b"") == 5
+    assert trie.count_prefix(b"8") == 0
+    assert list(trie.iter_prefix(b"13;")) == sorted(
+        line for line in lines if line.startswith(b"13;")
+    )
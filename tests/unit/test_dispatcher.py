@@ -0,0 +1,41 @@
+import threading
+
+import pytest
+
+from project.utils.dispatcher import BoundedDispatcher
+
+
+def test_dispatcher_sheds_work_when_saturated():
+    """
+    Tasks beyond the worker count plus queue depth are refused instead of queued.
+    """
+    release = threading.Event()
+    dispatcher = BoundedDispatcher(max_workers=1, queue_size=1)
+    try:
+        assert dispatcher.submit(release.wait)
+        assert dispatcher.submit(release.wait)
+        assert not dispatcher.submit(release.wait)
+        assert dispatcher.rejected == 1
+    finally:
+        release.set()
+        dispatcher.shutdown()
+
+
+def test_dispatcher_frees_capacity_when_tasks_finish():
+    done = threading.Event()
+    dispatcher = BoundedDispatcher(max_workers=1, queue_size=0)
+    try:
+        assert dispatcher.submit(lambda: None)
+        # The slot is released by a done-callback; wait until it is available again
+        for _ in range(100):
+            if dispatcher.submit(done.set):
+                break
+            threading.Event().wait(0.01)
+        assert done.wait(1)
+    finally:
+        dispatcher.shutdown()
+
+
+def test_dispatcher_rejects_invalid_sizes():
+    with pytest.raises(ValueError):
+        BoundedDispatcher(max_workers=0, queue_size=1)
@@ -0,0 +1,180 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from project.search_scripts import numpy_search, parallel_search
+from project.search_scripts.engine import ENGINES, MATCH_MODES
+from project.search_scripts.parallel_search import get_scan_pool, split_newline_aligned
+from project.search_scripts.registry import (
+    available_engines,
+    create_engine,
+    resolve_engine_name,
+)
+from project.search_scripts.sorted_index import SortedLineIndex
+
+EXACT_ENGINES = ["hash_set", "trie"]
+SUBSTRING_ENGINES = ["linear", "kmp", "boyer_moore"]
+
+
+def test_builtin_engines_are_registered():
+    """
+    Every algorithm in search_scripts is selectable by name.
+    """
+    assert set(EXACT_ENGINES + SUBSTRING_ENGINES) <= set(available_engines())
+
+
+def test_auto_keeps_original_selection():
+    assert resolve_engine_name("auto", reread_on_query=True) == "linear"
+    assert resolve_engine_name("auto", reread_on_query=False) == "hash_set"
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_engine_name("nope", reread_on_query=False)
+
+
+@pytest.mark.parametrize("reread_on_query", [True, False])
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_engines_find_full_lines(sample_file, name, reread_on_query):
+    engine = create_engine(name, sample_file, reread_on_query)
+
+    assert engine.search("13;0;23;11;0;16;5;0;")
+    assert not engine.search("99;99;99;")
+    assert engine.search_many(["1;2;3;4;5;6;7;8;", "0;0;0;"]) == [True, False]
+    assert engine.stats()["engine"] == name
+
+
+# The empty query is answered as the linear scan answers it: it starts and occurs in every line,
+# but only equals a blank one
+MODE_QUERIES = ["13;0;23;11;0;16;5;0;", "13;0;23;", "23;11;0;", "9;9;", ""]
+MODE_RESULTS = {
+    "exact": [True, False, False, False, False],
+    "prefix": [True, True, False, False, True],
+    "substring": [True, True, True, False, True],
+}
+
+
+@pytest.mark.parametrize("reread_on_query", [True, False])
+@pytest.mark.parametrize("match_mode", MATCH_MODES)
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_engines_honor_or_reject_match_mode(
+    sample_file, name, match_mode, reread_on_query
+):
+    if match_mode not in ENGINES[name].match_modes:
+        with pytest.raises(ValueError):
+            create_engine(name, sample_file, reread_on_query, match_mode=match_mode)
+        return
+
+    engine = create_engine(name, sample_file, reread_on_query, match_mode=match_mode)
+
+    assert [engine.search(query) for query in MODE_QUERIES] == MODE_RESULTS[match_mode]
+    assert engine.search_many(MODE_QUERIES) == MODE_RESULTS[match_mode]
+    assert engine.stats()["match_mode"] == match_mode
+
+
+@pytest.mark.parametrize("reread_on_query", [True, False])
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_empty_query_equals_a_blank_line(tmp_path, name, reread_on_query):
+    file_path = tmp_path / "blank.txt"
+    file_path.write_text("1;2;\n  \n3;\n")
+
+    for match_mode in ENGINES[name].match_modes:
+        engine = create_engine(
+            name, str(file_path), reread_on_query, match_mode=match_mode
+        )
+        assert engine.search("") is True
+        assert engine.search_many(["", "4;"]) == [True, False]
+
+
+def test_auto_picks_an_engine_for_the_match_mode():
+    assert (
+        resolve_engine_name("auto", reread_on_query=False, match_mode="prefix")
+        == "trie"
+    )
+    assert (
+        resolve_engine_name("auto", reread_on_query=False, match_mode="substring")
+        == "mmap"
+    )
+    assert (
+        resolve_engine_name("auto", reread_on_query=True, match_mode="exact")
+        == "linear"
+    )
+    with pytest.raises(ValueError):
+        resolve_engine_name("auto", reread_on_query=False, match_mode="fuzzy")
+
+
+def test_sorted_line_index_binary_search():
+    index = SortedLineIndex.from_lines([b"b;", b"a;", b"c;1;", b"a;"])
+
+    assert len(index) == 3
+    assert [index.record(i) for i in range(len(index))] == [b"a;", b"b;", b"c;1;"]
+    assert b"c;1;" in index
+    assert b"c;" not in index
+    assert b"" not in index
+    assert b"z;" not in index
+
+
+def test_parallel_scan_splits_on_line_boundaries(sample_file):
+    with open(sample_file, "rb") as file:
+        data = file.read()
+
+    ranges = split_newline_aligned(sample_file, 3)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(
+        end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:])
+    )
+    assert all(data[end - 1 : end] == b"\n" for _, end in ranges)
+
+
+def test_parallel_scan_uses_process_pool(sample_file, monkeypatch):
+    engine = create_engine("parallel_scan", sample_file, reread_on_query=True)
+    scanner = engine.engine
+    monkeypatch.setattr(scanner, "min_chunk_size", 16)
+    monkeypatch.setattr(scanner, "processes", 2)
+
+    assert scanner.search("18;2;9;")
+    assert not scanner.search("99;99;")
+
+
+def test_parallel_scan_replaces_a_broken_pool(sample_file, monkeypatch):
+    engine = create_engine("parallel_scan", sample_file, reread_on_query=True)
+    scanner = engine.engine
+    monkeypatch.setattr(scanner, "min_chunk_size", 16)
+    monkeypatch.setattr(scanner, "processes", 2)
+    pool = get_scan_pool(2)
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+
+    assert scanner.search("18;2;9;")
+    assert get_scan_pool(2) is not pool
+    assert scanner.search("18;2;9;")
+    assert not scanner.search("99;99;")
+
+
+def test_parallel_scan_shares_cores_between_preforked_workers(monkeypatch):
+    monkeypatch.setattr(parallel_search.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(parallel_search.settings, "worker_processes", 4)
+    assert parallel_search.default_scan_processes() == 2
+
+    monkeypatch.setattr(parallel_search.settings, "worker_processes", 16)
+    assert parallel_search.default_scan_processes() == 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 18])
+def test_numpy_scan_finds_matches_across_chunks(sample_file, monkeypatch, chunk_size):
+    monkeypatch.setattr(numpy_search, "SCAN_CHUNK_SIZE", chunk_size)
+    engine = create_engine("numpy_scan", sample_file, reread_on_query=True)
+
+    assert engine.search_many(
+        ["1", "8;", "0;23;11", "5;6;7;8;", "18;2;9;0;\n", "", "9;9;"]
+    ) == [
+        True,
+        True,
+        True,
+        True,
+        False,
+        True,
+        False,
+    ]
@@ -0,0 +1,142 @@
+import mmap
+import os
+
+import pytest
+
+from prefork import prepare_shared_index
+from project.search_scripts import hash_set_search
+from project.search_scripts.flat_hash_index import FlatHashIndex
+from project.search_scripts.index_file import (
+    hash_index_path_for,
+    index_path_for,
+    load_hash_index,
+    load_index,
+    load_suffix_array,
+    verify_index,
+    write_hash_index,
+    write_index,
+    write_suffix_array,
+)
+from project.search_scripts.registry import create_engine
+
+
+def test_prebuilt_index_round_trip(sample_file):
+    index_path = write_index(sample_file)
+    assert index_path == index_path_for(sample_file)
+
+    index = load_index(index_path, sample_file)
+
+    assert len(index) == 4
+    assert b"7;21;3;0;18;2;9;0;" in index
+    assert b"7;21;3;" not in index
+    assert verify_index(index_path, sample_file)
+
+
+def test_stale_or_invalid_index_is_ignored(sample_file, tmp_path):
+    index_path = write_index(sample_file)
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+
+    assert load_index(index_path, sample_file) is None
+    assert not verify_index(index_path, sample_file)
+
+    bogus_path = tmp_path / "bogus.idx"
+    bogus_path.write_bytes(b"not an index")
+    assert load_index(str(bogus_path)) is None
+    assert load_index(str(tmp_path / "missing.idx")) is None
+
+
+def test_sorted_array_engine_maps_prebuilt_index(sample_file):
+    write_index(sample_file)
+
+    engine = create_engine("sorted_array", sample_file, reread_on_query=False)
+
+    assert engine.stats()["prebuilt"]
+    assert engine.search("1;2;3;4;5;6;7;8;")
+
+
+def test_flat_hash_index_matches_whole_lines_only():
+    lines = [b"13;0;23;", b"7;21;", b"", b"1;2;3;", b"13;0;23;"]
+    index = FlatHashIndex.from_lines(lines)
+
+    assert len(index) == 4
+    assert all(line in index for line in lines)
+    assert b"13;0;" not in index
+    assert b"7;21;\n1;2;3;" not in index
+    assert b"1;2;3;4;" not in index
+
+
+def test_single_process_hash_set_ignores_a_prebuilt_index(sample_file):
+    write_hash_index(sample_file)
+
+    engine = create_engine("hash_set", sample_file, reread_on_query=False)
+
+    assert not engine.stats()["prebuilt"]
+    assert engine.search("7;21;3;0;18;2;9;0;")
+
+
+def test_hash_index_is_shared_by_hash_set_engines(sample_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(hash_set_search, "SHARED_HASH_INDEXES", {})
+    directory = tmp_path / "workers"
+    directory.mkdir()
+    prepare_shared_index(sample_file, "hash_set", str(directory))
+    index_path = hash_set_search.SHARED_HASH_INDEXES[sample_file]
+    assert os.path.dirname(index_path) == str(directory)
+    assert not os.path.exists(hash_index_path_for(sample_file))
+    index = load_hash_index(index_path, sample_file)
+    assert len(index) == 4 and b"7;21;3;0;18;2;9;0;" in index
+
+    engine = create_engine(
+        "hash_set", sample_file, reread_on_query=False, watch_file=True
+    )
+    assert engine.stats()["prebuilt"]
+    assert engine.search_many(["7;21;3;0;18;2;9;0;", "7;21;3;", "2;2;2;"]) == [
+        True,
+        False,
+        False,
+    ]
+
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+
+    assert load_hash_index(index_path, sample_file) is None
+    assert engine.search_many(["2;2;2;", "1;2;3;4;5;6;7;8;"]) == [True, True]
+
+
+def test_invalid_hash_index_is_ignored(sample_file, tmp_path):
+    bogus_path = tmp_path / "bogus.hidx"
+    bogus_path.write_bytes(b"not an index")
+    assert load_hash_index(str(bogus_path), sample_file) is None
+    assert load_hash_index(str(tmp_path / "missing.hidx"), sample_file) is None
+
+    index_path = write_hash_index(sample_file, str(tmp_path / "data.hidx"))
+    with open(index_path, "r+b") as file:
+        file.truncate(200)
+    assert load_hash_index(index_path, sample_file) is None
+
+
+@pytest.mark.parametrize(
+    "write, load",
+    [
+        (write_index, load_index),
+        (write_hash_index, load_hash_index),
+        (write_suffix_array, load_suffix_array),
+    ],
+)
+def test_index_of_a_missing_data_file_is_ignored(
+    sample_file, tmp_path, monkeypatch, write, load
+):
+    index_path = write(sample_file, str(tmp_path / "saved.index"))
+    os.remove(sample_file)
+    mappings = []
+
+    def record_mapping(*args, **kwargs):
+        mapping = real_mmap(*args, **kwargs)
+        mappings.append(mapping)
+        return mapping
+
+    real_mmap = mmap.mmap
+    monkeypatch.setattr(mmap, "mmap", record_mapping)
+
+    assert load(index_path, sample_file) is None
+    assert len(mappings) == 1 and mappings[0].closed
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from project.search_scripts.file_watch import APPENDED, REPLACED, UNCHANGED, FileWatcher
+from project.search_scripts.registry import create_engine
+
+
+def _bump_mtime(file_path):
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_watcher_classifies_changes(sample_file):
+    watcher = FileWatcher(sample_file)
+    size = os.path.getsize(sample_file)
+
+    assert watcher.check() == (UNCHANGED, size)
+
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+    assert watcher.check() == (APPENDED, size)
+
+    with open(sample_file, "w") as file:
+        file.write("3;3;3;\n")
+    _bump_mtime(sample_file)
+    assert watcher.check()[0] == REPLACED
+
+
+@pytest.mark.parametrize("name", ["hash_set", "trie"])
+def test_live_engine_ingests_appended_lines(sample_file, name):
+    engine = create_engine(name, sample_file, reread_on_query=True, watch_file=True)
+    assert not engine.search("2;2;2;")
+
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+
+    assert engine.search("2;2;2;")
+    assert engine.stats()["appends"] == 1
+    assert engine.stats()["rebuilds"] == 0
+
+
+def test_live_engine_rebuilds_rewritten_file(sample_file):
+    engine = create_engine(
+        "hash_set", sample_file, reread_on_query=False, watch_file=True
+    )
+    assert engine.search("1;2;3;4;5;6;7;8;")
+
+    with open(sample_file, "w") as file:
+        file.write("3;3;3;\n")
+    _bump_mtime(sample_file)
+
+    # The query that notices the change is answered from the old index while the new one builds
+    engine.search("3;3;3;")
+    engine.reload_thread.join(timeout=5)
+
+    assert engine.search("3;3;3;")
+    assert not engine.search("1;2;3;4;5;6;7;8;")
+    assert engine.stats()["rebuilds"] == 1
+
+
+@pytest.mark.parametrize("name", ["mmap", "numpy_scan", "boyer_moore", "suffix_array"])
+def test_engines_keeping_file_bytes_survive_truncation(sample_file, name):
+    with open(sample_file, "a") as file:
+        file.writelines(f"{i};{i % 31};\n" for i in range(3000))
+    engine = create_engine(name, sample_file, reread_on_query=False, watch_file=True)
+    assert engine.search("23;11;")
+
+    # A mapping kept across the rewrite would fault with SIGBUS on the pages past the new end
+    with open(sample_file, "w") as file:
+        file.write("3;\n")
+    _bump_mtime(sample_file)
+
+    assert engine.search("23;11;")
+    engine.reload_thread.join(timeout=5)
+
+    assert engine.search("3;")
+    assert not engine.search("23;11;")
+
+
+def test_reload_swaps_in_a_new_index(sample_file):
+    engine = create_engine("hash_set", sample_file, reread_on_query=False)
+    original = engine.engine
+
+    with open(sample_file, "w") as file:
+        file.write("3;3;3;\n")
+
+    assert engine.reload()
+    engine.reload_thread.join(timeout=5)
+
+    assert engine.engine is not original
+    assert engine.search("3;3;3;")
+    # The old index was left untouched for lookups that were still using it
+    assert original.search("1;2;3;4;5;6;7;8;")
@@ -0,0 +1,25 @@
+import time
+
+from prefork import Supervisor
+
+
+def exit_immediately(reuse_port):
+    assert reuse_port
+
+
+def test_supervisor_restarts_crashed_workers_with_backoff():
+    supervisor = Supervisor(exit_immediately, worker_processes=1)
+    supervisor.check_workers()
+    first = supervisor.workers[0]
+    first.join(timeout=5)
+    assert first.exitcode == 0
+
+    # A worker that dies straight away is restarted only after a delay
+    supervisor.check_workers()
+    assert supervisor.workers[0] is None
+    assert supervisor.restart_delay[0] == 1.0
+
+    supervisor.started_at[0] = time.monotonic() - 1.0
+    supervisor.check_workers()
+    assert supervisor.workers[0] is not None and supervisor.workers[0] is not first
+    supervisor.workers[0].join(timeout=5)
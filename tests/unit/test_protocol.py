@@ -0,0 +1,111 @@
+import pytest
+
+from project.protocol import (
+    RESPONSE_EXISTS,
+    RESPONSE_NOT_FOUND,
+    ProtocolSession,
+    RequestBuffer,
+    decode_query,
+)
+from project.search_scripts.registry import create_engine
+
+
+def test_decode_query_strips_padding():
+    assert decode_query(b"13;0;23;\x00\x00") == "13;0;23;"
+    assert decode_query(b"  1;2;3;\r\n") == "1;2;3;"
+
+
+def test_request_buffer_splits_pipelined_queries():
+    buffer = RequestBuffer(max_query_size=64)
+
+    assert buffer.feed(b"1;2;\n3;") == ["1;2;"]
+    assert buffer.feed(b"4;\n5;6;\n") == ["3;4;", "5;6;"]
+    assert buffer.feed(b"7;") == []
+    assert buffer.flush() == ["7;"]
+    assert buffer.flush() == []
+
+
+def test_request_buffer_rejects_oversized_query():
+    buffer = RequestBuffer(max_query_size=4)
+
+    with pytest.raises(ValueError):
+        buffer.feed(b"123456")
+
+
+def test_responses_are_newline_terminated():
+    assert RESPONSE_EXISTS == b"STRING EXISTS\n"
+    assert RESPONSE_NOT_FOUND == b"STRING NOT FOUND\n"
+
+
+@pytest.fixture
+def session(sample_file):
+    engine = create_engine("hash_set", sample_file, reread_on_query=False)
+    return ProtocolSession(engine, max_batch_size=3)
+
+
+def test_session_answers_plain_queries(session):
+    assert session.handle_lines(["1;2;3;4;5;6;7;8;", "0;"]) == (
+        RESPONSE_EXISTS + RESPONSE_NOT_FOUND
+    )
+
+
+def test_session_answers_batch_with_one_results_line(session):
+    assert session.handle_line("BATCH 3") == b""
+    assert session.handle_line("7;21;3;0;18;2;9;0;") == b""
+    assert session.handle_line("0;") == b""
+    assert session.handle_line("1;2;3;4;5;6;7;8;") == b"RESULTS 101\n"
+
+    # The session is back to plain queries afterwards
+    assert session.handle_line("0;") == RESPONSE_NOT_FOUND
+
+
+@pytest.mark.parametrize("header", ["BATCH", "BATCH x", "BATCH 0", "BATCH 4"])
+def test_session_rejects_invalid_batch_sizes(session, header):
+    assert session.handle_line(header).startswith(b"ERROR ")
+
+
+def test_reload_command_requires_admin_commands(sample_file):
+    engine = create_engine("hash_set", sample_file, reread_on_query=False)
+
+    assert (
+        ProtocolSession(engine, max_batch_size=3).handle_line("RELOAD")
+        == RESPONSE_NOT_FOUND
+    )
+
+    admin_session = ProtocolSession(engine, max_batch_size=3, allow_admin_commands=True)
+    assert admin_session.handle_line("RELOAD") == b"RELOADING\n"
+    engine.reload_thread.join(timeout=5)
+
+
+def test_session_answers_prefix_queries_with_counts(sample_file):
+    engine = create_engine("trie", sample_file, reread_on_query=False)
+    session = ProtocolSession(engine, max_batch_size=3)
+
+    assert session.handle_line("PREFIX 13;0;23;") == b"COUNT 2\n"
+    assert (
+        session.handle_line("PREFIX 13;0;23; 1") == b"COUNT 2\n13;0;23;11;0;16;5;0;\n"
+    )
+    assert session.handle_line("PREFIX 9;") == b"COUNT 0\n"
+    assert session.handle_line("PREFIX 1; x").startswith(b"ERROR")
+    assert session.handle_line("PREFIX 1; 4").startswith(b"ERROR")
+
+
+def test_session_rejects_prefix_queries_on_other_engines(session):
+    assert session.handle_line("PREFIX 13;").startswith(b"ERROR")
+
+
+def test_session_answers_field_queries(sample_file):
+    engine = create_engine("packed_records", sample_file, reread_on_query=False)
+    session = ProtocolSession(engine, max_batch_size=3)
+
+    assert (
+        session.handle_line("FIELDS 13;*;23;*;0;*;*;0; 3")
+        == b"COUNT 1\n13;0;23;11;0;16;5;0;\n"
+    )
+    assert session.handle_line("FIELDS *;*;*;") == b"COUNT 0\n"
+    assert session.handle_line("FIELDS 13;*").startswith(b"ERROR")
+    assert session.handle_line("FIELDS").startswith(b"ERROR")
+
+
+def test_session_rejects_field_queries_on_other_engines(session):
+    assert session.handle_line("FIELDS 13;*;").startswith(b"ERROR")
@@ -0,0 +1,172 @@
+import io
+
+import numpy as np
+import pytest
+
+from project.search_scripts.record_search import (
+    PackedRecordIndex,
+    decode_record,
+    encode_record,
+    encode_records,
+    iter_encoded_chunks,
+    parse_field_pattern,
+    scan_fields,
+    scan_records,
+)
+from project.search_scripts.registry import create_engine
+
+
+def test_encode_record_only_accepts_canonical_records():
+    assert encode_record(b"13;0;23;11;0;16;5;0;") != encode_record(
+        b"13;0;23;11;0;16;5;1;"
+    )
+    assert encode_record(b"1;2;") != encode_record(b"1;2;0;")
+    assert encode_record(b"31;") is not None
+    for line in [
+        b"",
+        b";",
+        b"1;2",
+        b"01;",
+        b"32;",
+        b"1;a;",
+        b"1;;",
+        b"-1;",
+        b"1;" * 13,
+    ]:
+        assert encode_record(line) is None, line
+
+
+def test_encode_records_agrees_with_encode_record():
+    lines = [
+        b"13;0;23;11;0;16;5;0;",
+        b"",
+        b"1;5;",
+        b"01;",
+        b"123;",
+        b"32;",
+        b";1;",
+        b"1;" * 13,
+    ]
+    lines += [b"1;a;", b"31;", b"9;10;", b"1;2"]
+    keys, valid, _, _ = encode_records(b"\n".join(lines) + b"\n")
+
+    for line, key, fits in zip(lines, keys.tolist(), valid.tolist()):
+        expected = encode_record(line)
+        assert fits == (expected is not None), line
+        assert not fits or key == expected, line
+
+
+def test_chunked_encoding_completes_lines_split_by_a_chunk():
+    text = b"13;0;23;11;0;16;5;0;\n hello \n1;5;\n 2;3; \n31;"
+    chunks = list(iter_encoded_chunks(io.BytesIO(text), chunk_size=5))
+
+    keys = np.concatenate([keys for keys, _ in chunks]).tolist()
+    lines = [b"13;0;23;11;0;16;5;0;", b"1;5;", b"2;3;", b"31;"]
+    assert keys == [encode_record(line) for line in lines]
+    assert [line for _, fallback in chunks for line in fallback] == [b"hello"]
+
+
+def test_packed_index_falls_back_to_strings():
+    index = PackedRecordIndex.from_lines([b"1;2;3;", b"1;2;3;", b"hello", b"40;1;"])
+
+    assert len(index.keys) == 1
+    assert index.fallback == {b"hello", b"40;1;"}
+    assert index.contains_many(
+        [b"1;2;3;", b"hello", b"40;1;", b"1;2;", b"01;2;3;"]
+    ) == [
+        True,
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert b"1;2;3;" in index
+    assert b"3;2;1;" not in index
+
+
+def test_packed_records_engine_ingests_appended_lines(sample_file):
+    engine = create_engine(
+        "packed_records", sample_file, reread_on_query=False, watch_file=True
+    )
+    assert not engine.search("2;2;2;")
+
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+
+    assert engine.search_many(["2;2;2;", "7;21;3;0;18;2;9;0;", "7;21;"]) == [
+        True,
+        True,
+        False,
+    ]
+    assert engine.stats()["records"] == 4
+
+
+def test_decode_record_inverts_encode_record():
+    for line in [b"13;0;23;11;0;16;5;0;", b"0;", b"31;" * 12]:
+        assert decode_record(encode_record(line)) == line
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (b"13;*;23;*;0;*;*;0;", [b"13;0;23;11;0;16;5;0;"]),
+        (
+            b"*;*;*;*;*;*;*;*;",
+            [b"13;0;23;11;0;16;5;0;", b"1;2;3;4;5;6;7;8;", b"7;21;3;0;18;2;9;0;"],
+        ),
+        (b"*;0;", [b"40;0;"]),
+        (b"*;2;", [b"1;2;"]),
+        (b"*;2;*;", [b"1;2;3;"]),
+        (b"13;*;23;*;0;*;*;1;", []),
+        (b"01;*;", []),
+        (b"*;", []),
+    ],
+)
+def test_packed_index_matches_field_patterns(pattern, expected):
+    index = PackedRecordIndex.from_lines(
+        [
+            b"13;0;23;11;0;16;5;0;",
+            b"7;21;3;0;18;2;9;0;",
+            b"1;2;3;4;5;6;7;8;",
+            b"1;2;3;",
+            b"1;2;",
+            b"40;0;",
+        ]
+    )
+    keys, fallback = index.match_fields(parse_field_pattern(pattern))
+
+    assert sorted([decode_record(key) for key in keys.tolist()] + fallback) == expected
+    text = b"".join(decode_record(key) + b"\n" for key in index.keys.tolist())
+    scanned, _ = scan_fields(io.BytesIO(text * 2), parse_field_pattern(pattern))
+    assert scanned.tolist() == keys.tolist()
+
+
+def test_scan_records_agrees_with_the_index():
+    lines = [b"1;2;3;", b"hello", b"40;1;", b"7;7;"]
+    queries = [b"1;2;3;", b"hello", b"40;1;", b"1;2;", b"01;2;3;", b"7;7;", b"bye"]
+
+    found = scan_records(io.BytesIO(b"\n".join(lines)), queries)
+
+    assert found == PackedRecordIndex.from_lines(lines).contains_many(queries)
+    assert found == [True, True, True, False, False, True, False]
+
+
+def test_packed_records_engine_answers_field_queries(sample_file):
+    engine = create_engine(
+        "packed_records", sample_file, reread_on_query=False, watch_file=True
+    )
+    assert engine.field_search("13;0;23;*;*;*;*;*;", 1) == (2, ["13;0;23;11;0;16;5;0;"])
+
+    with open(sample_file, "a") as file:
+        file.write("13;0;23;9;9;9;9;9;\n")
+
+    assert engine.field_search("13;*;23;*;*;*;*;*;")[0] == 3
+    with pytest.raises(ValueError):
+        engine.field_search("13;*")
+
+
+def test_packed_records_engine_scans_the_file_when_rereading(sample_file):
+    engine = create_engine("packed_records", sample_file, reread_on_query=True)
+
+    assert engine.search_many(["1;2;3;4;5;6;7;8;", "7;21;"]) == [True, False]
+    assert engine.field_search("13;0;23;*;*;*;*;*;", 1) == (2, ["13;0;23;11;0;16;5;0;"])
@@ -0,0 +1,69 @@
+import os
+
+from project.search_scripts.registry import create_engine
+from project.search_scripts.result_cache import ResultCache
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 0, True)
+    cache.put("b", 0, False)
+    assert cache.get("a", 0) is True
+    cache.put("c", 0, True)
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) is True
+    assert cache.stats()["cache_evictions"] == 1
+
+
+def test_result_cache_drops_entries_of_older_generations():
+    cache = ResultCache(max_entries=8)
+    cache.put("a", 1, True)
+
+    assert cache.get("a", 2) is None
+    # A result computed against the old generation is never served for the new one
+    cache.put("a", 1, True)
+    assert cache.get("a", 2) is None
+    assert cache.stats()["cache_invalidations"] == 2
+
+
+def test_result_cache_expires_entries():
+    cache = ResultCache(max_entries=8, ttl=1e-9)
+    cache.put("a", 0, True)
+
+    assert cache.get("a", 0) is None
+    assert cache.stats()["cache_expirations"] == 1
+
+
+def test_cached_engine_sees_file_changes_when_rereading(sample_file):
+    engine = create_engine(
+        "linear", sample_file, reread_on_query=True, result_cache_size=16
+    )
+    assert not engine.search("2;2;2;")
+    assert engine.search_many(["2;2;2;", "1;2;3;"]) == [False, True]
+    assert engine.stats()["cache_hits"] == 1
+
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+    stat = os.stat(sample_file)
+    os.utime(sample_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert engine.search("2;2;2;")
+
+
+def test_cached_engine_invalidates_on_ingested_lines(sample_file):
+    engine = create_engine(
+        "hash_set",
+        sample_file,
+        reread_on_query=False,
+        watch_file=True,
+        result_cache_size=16,
+    )
+    assert not engine.search("2;2;2;")
+    assert not engine.search("2;2;2;")
+
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+
+    assert engine.search("2;2;2;")
+    assert engine.stats()["cache_invalidations"] == 1
@@ -0,0 +1,131 @@
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+import time
+
+import pytest
+
+from config.settings import get_settings
+from project.search_scripts.registry import create_engine
+from server import ConnectionPoller, handle_client_connection
+from utils.dispatcher import BoundedDispatcher
+
+
+def _run_handler(file_path, payload, close_write=True, pause_after=None):
+    engine = create_engine("hash_set", file_path, reread_on_query=False)
+    server_sock, client_sock = socket.socketpair()
+    handler = threading.Thread(
+        target=handle_client_connection, args=(server_sock, ("127.0.0.1", 0), engine)
+    )
+    handler.start()
+    try:
+        if pause_after is not None:
+            # The first line arrives in two reads
+            client_sock.sendall(payload[:pause_after])
+            time.sleep(0.02)
+            payload = payload[pause_after:]
+        client_sock.sendall(payload)
+        if close_write:
+            client_sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := client_sock.recv(4096):
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        handler.join(timeout=5)
+        client_sock.close()
+
+
+def test_persistent_connection_answers_pipelined_queries_in_order(sample_file):
+    payload = b"13;0;23;11;0;16;5;0;\n0;0;\n1;2;3;4;5;6;7;8;\n7;21;"
+
+    response = _run_handler(sample_file, payload + b"3;0;18;2;9;0;")
+
+    assert response == (
+        b"STRING EXISTS\nSTRING NOT FOUND\nSTRING EXISTS\nSTRING EXISTS\n"
+    )
+
+
+def test_legacy_query_without_terminator_gets_one_response(sample_file):
+    response = _run_handler(sample_file, b"1;2;3;4;5;6;7;8;", close_write=False)
+
+    assert response == b"STRING EXISTS\n"
+
+
+def test_first_line_split_across_reads_keeps_connection_open(sample_file, monkeypatch):
+    # Longer than the pause between the two reads
+    monkeypatch.setattr(get_settings(), "first_line_timeout", 1.0)
+    payload = b"13;0;23;11;0;16;5;0;\n0;0;\n"
+
+    response = _run_handler(sample_file, payload, pause_after=8)
+
+    assert response == b"STRING EXISTS\nSTRING NOT FOUND\n"
+
+
+def test_idle_persistent_connections_do_not_hold_workers(sample_file):
+    engine = create_engine("hash_set", sample_file, reread_on_query=False)
+    listener = socket.create_server(("127.0.0.1", 0))
+    poller = ConnectionPoller(listener, engine, BoundedDispatcher(1, 1))
+    runner = threading.Thread(target=poller.run)
+    runner.start()
+    clients = []
+    try:
+        # Each client gets an answer, then stays connected without sending anything
+        for _ in range(3):
+            client = socket.create_connection(listener.getsockname(), timeout=5)
+            clients.append(client)
+            client.sendall(b"1;2;3;4;5;6;7;8;\n")
+            assert client.recv(4096) == b"STRING EXISTS\n"
+
+        clients[0].sendall(b"0;0;\n")
+        assert clients[0].recv(4096) == b"STRING NOT FOUND\n"
+    finally:
+        poller.stop()
+        runner.join(timeout=5)
+        for client in clients:
+            client.close()
+        listener.close()
+
+
+def test_silent_tls_client_does_not_block_other_clients(sample_file, tmp_path):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is needed to create a test certificate")
+    certfile, keyfile = tmp_path / "server.crt", tmp_path / "server.key"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-subj",
+            "/CN=localhost",
+        ]
+        + ["-days", "1", "-keyout", str(keyfile), "-out", str(certfile)],
+        check=True,
+        capture_output=True,
+    )
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(certfile, keyfile)
+    client_context = ssl.create_default_context(cafile=str(certfile))
+    client_context.check_hostname = False
+
+    engine = create_engine("hash_set", sample_file, reread_on_query=False)
+    listener = socket.create_server(("127.0.0.1", 0))
+    poller = ConnectionPoller(listener, engine, BoundedDispatcher(1, 1), server_context)
+    runner = threading.Thread(target=poller.run)
+    runner.start()
+    silent = socket.create_connection(listener.getsockname(), timeout=5)
+    try:
+        raw = socket.create_connection(listener.getsockname(), timeout=5)
+        with client_context.wrap_socket(raw) as client:
+            client.sendall(b"1;2;3;4;5;6;7;8;\n")
+            assert client.recv(4096) == b"STRING EXISTS\n"
+    finally:
+        poller.stop()
+        runner.join(timeout=5)
+        silent.close()
+        listener.close()
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+
+from project.search_scripts.index_file import (
+    load_suffix_array,
+    suffix_array_path_for,
+    write_suffix_array,
+)
+from project.search_scripts.registry import create_engine
+from project.search_scripts.suffix_array import SuffixArrayIndex
+
+
+def test_suffix_array_answers_substring_queries_like_a_scan():
+    random.seed(3)
+    lines = [
+        ";".join(str(random.randint(0, 12)) for _ in range(5)).encode() + b";"
+        for _ in range(40)
+    ]
+    index = SuffixArrayIndex.from_lines(lines + lines[:5])
+    queries = {line[i : i + n] for line in lines for i in range(4) for n in (1, 3, 7)}
+    queries |= {b"12;12;12;", b";\n1", b"99", b";0;0;0;"}
+
+    for query in queries:
+        assert (query in index) == any(query in line for line in lines), query
+    assert b"" in index
+    assert b"" not in SuffixArrayIndex.from_lines([])
+
+
+def test_kmp_cached_mode_finds_substrings(sample_file):
+    engine = create_engine("kmp", sample_file, reread_on_query=False)
+
+    assert engine.search("23;11;0;")
+    assert engine.search("3;0;18;")
+    assert not engine.search("0;1;2;")
+    assert engine.stats()["suffixes"] > 0
+
+
+def test_lcp_array_counts_occurrences():
+    text = b"13;0;13;0;\n0;13;\n13;\n"
+    with_lcp = SuffixArrayIndex.from_text(text, with_lcp=True)
+    without_lcp = SuffixArrayIndex(text, with_lcp.suffix_array)
+
+    assert with_lcp.suffix_array.dtype == np.int32
+    assert with_lcp.lcp[0] == 0
+    for key in [b"13;", b"0;", b"13;0;", b";", b"7"]:
+        assert with_lcp.count(key) == without_lcp.count(key) == text.count(key), key
+    assert with_lcp.count(b"3;\n") == 0
+
+
+def test_saved_suffix_array_is_mapped_by_the_engine(sample_file):
+    path = write_suffix_array(sample_file, with_lcp=True)
+    assert path == suffix_array_path_for(sample_file)
+
+    index = load_suffix_array(path, sample_file)
+    assert index.lcp is not None
+    assert b"0;18;2;9;" in index
+
+    engine = create_engine("suffix_array", sample_file, reread_on_query=False)
+    assert engine.stats()["prebuilt"]
+    assert engine.search("23;11;0;16;5;1;")
+    assert not engine.search("5;1;1;")
+
+    with open(sample_file, "a") as file:
+        file.write("2;2;2;\n")
+    assert load_suffix_array(path, sample_file) is None